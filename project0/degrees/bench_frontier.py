@@ -0,0 +1,98 @@
+import random
+import sys
+import time
+
+from util import Node, QueueFrontier
+
+# Size of the synthetic graph and its average number of co-stars per person
+PEOPLE = 1_000_000
+CO_STARS = 8
+
+# Number of expansions to time the list-based frontier over, since a full
+# breadth-first search with it on a million people takes hours
+LEGACY_EXPANSIONS = 2_000
+
+
+class ListQueueFrontier():
+    """
+    The previous list-backed frontier, kept here for comparison.
+    """
+
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier[0]
+            self.frontier = self.frontier[1:]
+            return node
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python bench_frontier.py [people]")
+    people = int(sys.argv[1]) if len(sys.argv) == 2 else PEOPLE
+
+    print(f"Building synthetic graph with {people} people...")
+    graph = synthetic_graph(people, CO_STARS, seed=0)
+
+    expansions = min(LEGACY_EXPANSIONS, people)
+    print(f"Breadth-first search, first {expansions} expansions:")
+    legacy = time_search(graph, ListQueueFrontier, expansions)
+    current = time_search(graph, QueueFrontier, expansions)
+    print(f"  list frontier:  {legacy:.3f}s")
+    print(f"  deque frontier: {current:.3f}s ({legacy / current:.0f}x faster)")
+
+    print(f"Breadth-first search, all {people} people:")
+    print(f"  deque frontier: {time_search(graph, QueueFrontier, people):.3f}s")
+
+
+def synthetic_graph(people, co_stars, seed):
+    """
+    Returns a random adjacency list where each person is connected
+    to roughly `co_stars` others, chained so the graph is connected.
+    """
+    rng = random.Random(seed)
+    graph = [[] for _ in range(people)]
+    for person in range(1, people):
+        other = rng.randrange(person)
+        graph[person].append(other)
+        graph[other].append(person)
+    for _ in range(people * (co_stars - 2) // 2):
+        a, b = rng.randrange(people), rng.randrange(people)
+        graph[a].append(b)
+        graph[b].append(a)
+    return graph
+
+
+def time_search(graph, frontier_class, expansions):
+    """
+    Returns the seconds taken to expand `expansions` nodes of a
+    breadth-first search from person 0, the way shortest_path does.
+    """
+    start = time.perf_counter()
+    frontier = frontier_class()
+    frontier.add(Node(state=0, parent=None, action=None))
+    explored = set()
+    while not frontier.empty() and len(explored) < expansions:
+        node = frontier.remove()
+        explored.add(node.state)
+        for person in graph[node.state]:
+            if not frontier.contains_state(person) and person not in explored:
+                frontier.add(Node(state=person, parent=node, action=None))
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
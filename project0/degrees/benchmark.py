@@ -0,0 +1,141 @@
+"""
+Benchmarks degrees.py on a dataset, such as one made by generate.py.
+
+Reports the time load_data takes, peak resident memory, and the p50 and
+p99 latency of shortest_path over a fixed, seeded set of queries between
+people who are in at least one movie, so runs can be compared.
+"""
+
+import argparse
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+
+import degrees
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("directory")
+    parser.add_argument("--queries", type=query_count, default=1000,
+                        help="number of queries, at least 2 for percentiles")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--search", choices=["bfs", "bidirectional", "batch"],
+                        default="bidirectional")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="delete the snapshot first, to time parsing the CSVs")
+    parser.add_argument("--costars", action="store_true",
+                        help="build the co-star adjacency before querying")
+    parser.add_argument("--landmarks", type=int, default=0,
+                        help="build this many landmarks before querying")
+    args = parser.parse_args()
+
+    path = os.path.join(args.directory, degrees.SNAPSHOT)
+    if args.rebuild and os.path.exists(path):
+        os.remove(path)
+    source = "snapshot" if os.path.exists(path) else "CSV"
+
+    start = time.perf_counter()
+    degrees.load_data(args.directory)
+    report(f"load ({source})", time.perf_counter() - start)
+    print(f"people: {len(degrees.person_ids)}, movies: {len(degrees.movie_ids)}, "
+          f"stars: {len(degrees.person_movies)}")
+
+    if args.costars:
+        start = time.perf_counter()
+        degrees.build_costars()
+        report("build costars", time.perf_counter() - start)
+    if args.landmarks:
+        start = time.perf_counter()
+        degrees.build_landmarks(args.landmarks)
+        report("build landmarks", time.perf_counter() - start)
+
+    pairs = query_set(args.queries, args.seed)
+    if not pairs:
+        sys.exit("No people with movies to query.")
+    latencies, lengths = run_queries(pairs, args.search)
+
+    found = [length for length in lengths if length is not None]
+    print(f"queries: {len(pairs)}, connected: {len(found)}, "
+          f"mean degrees: {statistics.fmean(found) if found else 0:.2f}")
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    report("p50 query", percentiles[49])
+    report("p99 query", percentiles[98])
+    report("max query", max(latencies))
+    print(f"peak RSS: {peak_rss() / 2 ** 20:.1f} MB")
+
+
+def query_count(text):
+    """
+    Returns the --queries argument, which needs at least two queries
+    for latency percentiles.
+    """
+    count = int(text)
+    if count < 2:
+        raise argparse.ArgumentTypeError("must be at least 2")
+    return count
+
+
+def query_set(count, seed):
+    """
+    Returns count (source, target) pairs of person_ids, chosen at random
+    with the given seed from people in at least one movie.
+    """
+    offsets = degrees.person_offsets
+    cast = [
+        person for person in range(len(degrees.person_ids))
+        if offsets[person + 1] > offsets[person]
+    ]
+    if not cast:
+        return []
+    rng = random.Random(seed)
+    return [
+        (degrees.person_ids[rng.choice(cast)], degrees.person_ids[rng.choice(cast)])
+        for _ in range(count)
+    ]
+
+
+def run_queries(pairs, search):
+    """
+    Returns the latency in seconds and the path length (or None) of
+    each query. In batch mode every query is charged the mean latency.
+    """
+    if search == "batch":
+        start = time.perf_counter()
+        paths = degrees.shortest_paths(pairs)
+        elapsed = (time.perf_counter() - start) / len(pairs)
+        return [elapsed] * len(pairs), [path_length(path) for path in paths]
+
+    latencies = []
+    lengths = []
+    for source, target in pairs:
+        start = time.perf_counter()
+        path = degrees.shortest_path(
+            source, target, bidirectional=(search == "bidirectional")
+        )
+        latencies.append(time.perf_counter() - start)
+        lengths.append(path_length(path))
+    return latencies, lengths
+
+
+def path_length(path):
+    return None if path is None else len(path)
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of this process, in bytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def report(label, seconds):
+    print(f"{label}: {seconds * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,258 @@
+import bisect
 import csv
+import heapq
+import itertools
+import math
+import multiprocessing
+import os
 import sys
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict, deque
+
+import snapshot
+from util import Node, StackFrontier, QueueFrontier, SortedIndex, UnionFind
+
+# Name of the binary snapshot load_data keeps next to the CSV files
+SNAPSHOT = "degrees.snapshot"
+
+# Most memory the cache of breadth-first search trees may use, in bytes
+TREE_CACHE_BYTES = 256 * 1024 * 1024
+
+# Number of landmarks build_landmarks picks by default
+LANDMARKS = 16
+
+# Most name index entries search_names ranks directly for one prefix;
+# more are found by walking name_popularity instead
+NAME_CANDIDATES = 1000
+
+# Maps person_ids and movie_ids to dense integer indices
+person_index = SortedIndex([], array("i"))
+movie_index = SortedIndex([], array("i"))
+
+# Indexed by person index: person_id, name and birth
+person_ids = []
+person_names = []
+person_births = []
+
+# Indexed by movie index: movie_id, title and year
+movie_ids = []
+movie_titles = []
+movie_years = []
+
+# Names folded by fold_name in sorted order, and the person index of each
+name_keys = []
+name_order = array("i")
+
+# Positions in the name index, of people in the most movies first
+name_popularity = array("i")
+
+# The person-movie graph in compressed sparse row form: the movies of
+# person p are person_movies[person_offsets[p]:person_offsets[p + 1]],
+# and the stars of movie m are movie_stars[movie_offsets[m]:movie_offsets[m + 1]]
+person_offsets = array("i", [0])
+person_movies = array("i")
+movie_offsets = array("i", [0])
+movie_stars = array("i")
+
+# The connected component of each person index, and the number
+# of people in each component
+components = array("i")
+component_sizes = array("i")
+
+# Person-to-person adjacency, if built, in compressed sparse row form: the
+# co-stars of person p are costar_people[costar_offsets[p]:costar_offsets[p + 1]],
+# each once, with one movie they share at the same position in costar_movies
+costar_offsets = array("i")
+costar_people = array("i")
+costar_movies = array("i")
+
+# Person indices of the landmarks, if built, and for each an array("b") of
+# its distance to every person index (-1 if unreachable or over 127)
+landmarks = []
+landmark_distances = []
+
+# Maps source person indices to their SearchTree, least recently used first
+search_trees = OrderedDict()
+search_trees_lock = threading.Lock()
 
-from util import Node, StackFrontier, QueueFrontier
 
-# Maps names to a set of corresponding person_ids
-names = {}
+def load_data(directory):
+    """
+    Load data from CSV files into memory.
 
-# Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
-people = {}
+    The parsed data is saved as a snapshot next to the CSV files, and
+    later runs memory-map that snapshot instead while it is newer
+    than all of them.
+    """
+    path = os.path.join(directory, SNAPSHOT)
+    sources = [
+        os.path.join(directory, f"{name}.csv")
+        for name in ("people", "movies", "stars")
+    ]
 
-# Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
-movies = {}
+    if snapshot.is_fresh(path, sources):
+        try:
+            use_sections(snapshot.read(path))
+            return
+        except (snapshot.SnapshotError, KeyError):
+            pass
 
+    sections = read_csv(directory)
+    use_sections(sections)
+    try:
+        snapshot.write(path, sections)
+    except OSError:
+        pass
 
-def load_data(directory):
+
+def read_csv(directory):
     """
-    Load data from CSV files into memory.
+    Parses the CSV files in directory into a dict of snapshot sections.
     """
+    sections = {
+        "person_ids": [],
+        "person_names": [],
+        "person_births": [],
+        "movie_ids": [],
+        "movie_titles": [],
+        "movie_years": [],
+    }
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
+            sections["person_ids"].append(row["id"])
+            sections["person_names"].append(row["name"])
+            sections["person_births"].append(row["birth"])
 
     # Load movies
     with open(f"{directory}/movies.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
+            sections["movie_ids"].append(row["id"])
+            sections["movie_titles"].append(row["title"])
+            sections["movie_years"].append(row["year"])
+
+    # Load stars as a list of (person, movie) edges, joining everyone
+    # in a movie into one component as they are read
+    people = {
+        person_id: person
+        for person, person_id in enumerate(sections["person_ids"])
+    }
+    movies = {
+        movie_id: movie
+        for movie, movie_id in enumerate(sections["movie_ids"])
+    }
+    edge_people = array("i")
+    edge_movies = array("i")
+    groups = UnionFind(len(people))
+    first_stars = array("i", [-1]) * len(movies)
     with open(f"{directory}/stars.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         for row in reader:
             try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
+                person = people[row["person_id"]]
+                movie = movies[row["movie_id"]]
             except KeyError:
-                pass
+                continue
+            edge_people.append(person)
+            edge_movies.append(movie)
+            if first_stars[movie] == -1:
+                first_stars[movie] = person
+            else:
+                groups.union(first_stars[movie], person)
+
+    sections["person_offsets"], sections["person_movies"] = compress(
+        edge_people, edge_movies, len(people)
+    )
+    sections["movie_offsets"], sections["movie_stars"] = compress(
+        edge_movies, edge_people, len(movies)
+    )
+    sections["components"], sections["component_sizes"] = groups.labels()
+
+    # Index ids, and names folded for lookup
+    sections["person_order"] = sort_indices(sections["person_ids"])
+    sections["movie_order"] = sort_indices(sections["movie_ids"])
+    folded = [fold_name(name) for name in sections["person_names"]]
+    sections["name_order"] = sort_indices(folded)
+    sections["name_keys"] = [folded[person] for person in sections["name_order"]]
+    order, offsets = sections["name_order"], sections["person_offsets"]
+    sections["name_popularity"] = array("i", sorted(
+        range(len(order)),
+        key=lambda i: (offsets[order[i]] - offsets[order[i] + 1], i)
+    ))
+
+    return sections
+
+
+def sort_indices(keys):
+    """
+    Returns an array of the indices of keys, sorted by key.
+    """
+    return array("i", sorted(range(len(keys)), key=keys.__getitem__))
+
+
+def use_sections(sections):
+    """
+    Makes the dict of snapshot sections the currently loaded data.
+    """
+    global person_index, movie_index
+    global person_ids, person_names, person_births
+    global movie_ids, movie_titles, movie_years
+    global name_keys, name_order, name_popularity
+    global person_offsets, person_movies, movie_offsets, movie_stars
+    global components, component_sizes
+    global costar_offsets, costar_people, costar_movies
+
+    person_ids = sections["person_ids"]
+    person_names = sections["person_names"]
+    person_births = sections["person_births"]
+    movie_ids = sections["movie_ids"]
+    movie_titles = sections["movie_titles"]
+    movie_years = sections["movie_years"]
+    name_keys = sections["name_keys"]
+    name_order = sections["name_order"]
+    name_popularity = sections["name_popularity"]
+    person_offsets = sections["person_offsets"]
+    person_movies = sections["person_movies"]
+    movie_offsets = sections["movie_offsets"]
+    movie_stars = sections["movie_stars"]
+    components = sections["components"]
+    component_sizes = sections["component_sizes"]
+
+    person_index = SortedIndex(person_ids, sections["person_order"])
+    movie_index = SortedIndex(movie_ids, sections["movie_order"])
+
+    costar_offsets = array("i")
+    costar_people = array("i")
+    costar_movies = array("i")
+    landmarks.clear()
+    landmark_distances.clear()
+    with search_trees_lock:
+        search_trees.clear()
+
+
+def compress(rows, columns, size):
+    """
+    Returns the (offsets, indices) arrays of the compressed sparse row
+    form of the edges rows[i] -> columns[i], for `size` rows.
+    """
+    offsets = array("i", [0]) * (size + 1)
+    for row in rows:
+        offsets[row + 1] += 1
+    for row in range(size):
+        offsets[row + 1] += offsets[row]
+
+    indices = array("i", [0]) * len(rows)
+    position = offsets[:-1]
+    for row, column in zip(rows, columns):
+        indices[position[row]] = column
+        position[row] += 1
+
+    return offsets, indices
 
 
 def main():
@@ -69,7 +272,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, bidirectional=True)
 
     if path is None:
         print("Not connected.")
@@ -78,21 +281,49 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = person_names[person_index[path[i][1]]]
+            person2 = person_names[person_index[path[i + 1][1]]]
+            movie = movie_titles[movie_index[path[i + 1][0]]]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, bidirectional=False, max_degrees=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    If bidirectional is True, searches from both ends at once
+    (see bidirectional_search), which visits far fewer people
+    on long paths but may pick a different path of the same length.
+
+    If max_degrees is given, paths longer than that are not looked for
+    and the bidirectional search is always used, cut off early with
+    the landmark index if it has been built.
+
     If no possible path, returns None.
-    """   
+    """
+    source = person_index[source]
+    target = person_index[target]
+
+    if max_degrees is not None:
+        path = bidirectional_search(source, target, max_degrees)
+    elif bidirectional:
+        path = bidirectional_search(source, target)
+    else:
+        path = breadth_first_search(source, target)
+
+    if path is None:
+        return None
+    return [(movie_ids[movie], person_ids[person]) for movie, person in path]
+
+
+def breadth_first_search(source, target):
+    """
+    Returns the shortest list of (movie, person) index pairs
+    that connect the source to the target index, or None.
+    """
     # Start is a node with source state, no parent(s) and no action(s) yet
-    # Use StackFrontier, i.e. Depth-first search
+    # Use QueueFrontier, i.e. Breadth-first search
     start = Node(state=source, parent=None, action=None)
     frontier = QueueFrontier()
     frontier.add(start)
@@ -105,6 +336,10 @@ def shortest_path(source, target):
         no_degree = []
         return no_degree
 
+    # People in different components are never connected
+    if not connected(source, target):
+        return None
+
     while not frontier.empty():
 
         # Remove the node from the frontier
@@ -114,9 +349,9 @@ def shortest_path(source, target):
         explored.add(node.state)
 
         # Add neighbors to frontier
-        for movie_id, person_id in neighbors_for_person(node.state):
-            if not frontier.contains_state(person_id) and person_id not in explored:
-                child = Node(state=person_id, parent=node, action=movie_id)
+        for movie, person in neighbors_for_index(node.state):
+            if not frontier.contains_state(person) and person not in explored:
+                child = Node(state=person, parent=node, action=movie)
 
                 # If node is the target, then we have a solution
                 if child.state == target:
@@ -133,30 +368,453 @@ def shortest_path(source, target):
     return None
 
 
+def bidirectional_search(source, target, max_degrees=None):
+    """
+    Returns the shortest list of (movie, person) index pairs
+    that connect the source to the target index, or None.
+
+    Breadth-first search outwards from both source and target, one whole
+    level at a time, always growing the smaller of the two frontiers.
+    The first person reached from both sides lies on a shortest path.
+
+    If max_degrees is given, only paths up to that length are looked for,
+    and people the landmarks show to be too far from the other end are
+    not expanded.
+    """
+    if source == target:
+        return []
+    if not connected(source, target):
+        return None
+    if max_degrees is None:
+        max_degrees = math.inf
+    elif landmark_bounds(source, target)[0] > max_degrees:
+        return None
+
+    # Maps each person reached from one side to the (movie, person)
+    # step leading back towards that side's starting person
+    forward = {source: None}
+    backward = {target: None}
+    forward_level = [source]
+    backward_level = [target]
+    forward_depth = backward_depth = 0
+
+    while (forward_level and backward_level
+           and forward_depth + backward_depth < max_degrees):
+        if len(forward_level) <= len(backward_level):
+            forward_depth += 1
+            forward_level, meeting = expand_level(
+                forward_level, forward, backward,
+                too_far(target, forward_depth, max_degrees)
+            )
+        else:
+            backward_depth += 1
+            backward_level, meeting = expand_level(
+                backward_level, backward, forward,
+                too_far(source, backward_depth, max_degrees)
+            )
+
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+
+    return None
+
+
+def expand_level(level, reached, other_reached, prune=None):
+    """
+    Expands every person in one level of a bidirectional search,
+    skipping new people for which prune(person) is True.
+
+    Returns the next level, and the first person found that was already
+    reached from the other side (or None).
+    """
+    next_level = []
+    for person in level:
+        for movie, neighbor in neighbors_for_index(person):
+            if neighbor in reached:
+                continue
+            if prune is not None and prune(neighbor):
+                continue
+            reached[neighbor] = (movie, person)
+            if neighbor in other_reached:
+                return next_level, neighbor
+            next_level.append(neighbor)
+    return next_level, None
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Returns the (movie, person) path through the meeting person,
+    following the forward steps back to the source and the backward
+    steps on to the target.
+    """
+    path = []
+    person = meeting
+    while forward[person] is not None:
+        movie, previous = forward[person]
+        path.append((movie, person))
+        person = previous
+    path.reverse()
+
+    person = meeting
+    while backward[person] is not None:
+        movie, following = backward[person]
+        path.append((movie, following))
+        person = following
+
+    return path
+
+
+def build_landmarks(count=LANDMARKS, people=None):
+    """
+    Builds the landmark index from the given person_ids, or else from
+    the count people with the most co-stars (counted once per movie),
+    by a breadth-first search from each landmark to everyone.
+    """
+    if people is not None:
+        chosen = [person_index[person_id] for person_id in people]
+    else:
+        chosen = heapq.nlargest(count, range(len(person_ids)), key=reach)
+
+    distances = [distances_from(person) for person in chosen]
+    landmarks[:] = chosen
+    landmark_distances[:] = distances
+
+
+def reach(person):
+    """
+    Returns the number of co-stars of a person index,
+    counting anyone in several of their movies once per movie.
+    """
+    start, end = person_offsets[person], person_offsets[person + 1]
+    return sum(
+        movie_offsets[movie + 1] - movie_offsets[movie]
+        for movie in person_movies[start:end]
+    )
+
+
+def distances_from(source):
+    """
+    Returns an array("b") of the degrees from the source person index to
+    every person index, or -1 where that is unreachable or over 127.
+    """
+    distances = array("b", [-1]) * len(person_ids)
+    distances[source] = 0
+    level = [source]
+    depth = 0
+    while level and depth < 127:
+        depth += 1
+        next_level = []
+        for person in level:
+            for _, neighbor in neighbors_for_index(person):
+                if distances[neighbor] == -1:
+                    distances[neighbor] = depth
+                    next_level.append(neighbor)
+        level = next_level
+    return distances
+
+
+def distance_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    two person_ids from the landmark index, with math.inf for an unknown
+    upper bound, or for both if they are not connected.
+    """
+    source = person_index[source]
+    target = person_index[target]
+    if not connected(source, target):
+        return math.inf, math.inf
+    return landmark_bounds(source, target)
+
+
+def landmark_bounds(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees between two connected
+    person indices, by the triangle inequality through each landmark.
+    """
+    if source == target:
+        return 0, 0
+
+    lower, upper = 1, math.inf
+    for distances in landmark_distances:
+        to_source, to_target = distances[source], distances[target]
+        if to_source == -1 or to_target == -1:
+            continue
+        lower = max(lower, abs(to_source - to_target))
+        upper = min(upper, to_source + to_target)
+    return lower, upper
+
+
+def within_degrees(source, target, n):
+    """
+    Returns True if two person_ids are at most n degrees apart, from
+    the landmark bounds alone where they settle it.
+    """
+    lower, upper = distance_bounds(source, target)
+    if upper <= n:
+        return True
+    if lower > n:
+        return False
+    return shortest_path(source, target, max_degrees=n) is not None
+
+
+def too_far(goal, depth, max_degrees):
+    """
+    Returns a function telling whether a person index reached at depth
+    is, by the landmarks, too far from the goal index for a path of at
+    most max_degrees, or None if there is nothing to prune by.
+    """
+    if not landmark_distances or max_degrees == math.inf:
+        return None
+
+    goal_distances = [
+        (distances, distances[goal]) for distances in landmark_distances
+        if distances[goal] != -1
+    ]
+    slack = max_degrees - depth
+
+    def prune(person):
+        for distances, to_goal in goal_distances:
+            to_person = distances[person]
+            if to_person != -1 and abs(to_person - to_goal) > slack:
+                return True
+        return False
+
+    return prune
+
+
+def shortest_paths(pairs):
+    """
+    Returns the shortest path for each (source, target) pair of person_ids,
+    in order, in the same form as shortest_path (None if not connected).
+
+    Pairs are grouped by source, and each source is searched once with a
+    breadth-first search tree that is kept in an LRU cache, so later
+    queries from the same source only walk its parent pointers.
+    """
+    by_source = {}
+    for i, (source, target) in enumerate(pairs):
+        by_source.setdefault(source, []).append(i)
+
+    paths = [None] * len(pairs)
+    for source, queries in by_source.items():
+        tree = search_tree(person_index[source])
+        with tree.lock:
+            for i in queries:
+                path = tree.path_to(person_index[pairs[i][1]])
+                if path is not None:
+                    paths[i] = [
+                        (movie_ids[movie], person_ids[person])
+                        for movie, person in path
+                    ]
+    return paths
+
+
+def paths_from(source, targets):
+    """
+    Returns the shortest path from source to each of targets,
+    as shortest_paths does.
+    """
+    return shortest_paths([(source, target) for target in targets])
+
+
+def search_tree(source):
+    """
+    Returns the cached SearchTree for a source person index, creating
+    it and evicting the least recently used trees as needed.
+    """
+    with search_trees_lock:
+        tree = search_trees.get(source)
+        if tree is not None:
+            search_trees.move_to_end(source)
+            return tree
+
+        tree = SearchTree(source)
+        search_trees[source] = tree
+        used = sum(tree.size() for tree in search_trees.values())
+        while used > TREE_CACHE_BYTES and len(search_trees) > 1:
+            _, evicted = search_trees.popitem(last=False)
+            used -= evicted.size()
+        return tree
+
+
+class SearchTree():
+    """
+    Breadth-first search tree rooted at one person index.
+
+    The tree is only grown as far as needed to reach the targets asked
+    of it so far, and picks up from its frontier when asked for more.
+    Callers must hold its lock while using it.
+    """
+
+    UNREACHED = -1
+
+    def __init__(self, source):
+        self.lock = threading.Lock()
+        self.source = source
+
+        # The person each reached person was reached from, and the movie
+        # they share, or UNREACHED
+        self.parents = array("i", [SearchTree.UNREACHED]) * len(person_ids)
+        self.movies = array("i", [SearchTree.UNREACHED]) * len(person_ids)
+        self.parents[source] = source
+
+        self.frontier = deque([source])
+
+    def size(self):
+        """
+        Returns the approximate memory used by the tree, in bytes.
+        """
+        return (
+            self.parents.itemsize * len(self.parents)
+            + self.movies.itemsize * len(self.movies)
+            + 8 * len(self.frontier)
+        )
+
+    def path_to(self, target):
+        """
+        Returns the shortest list of (movie, person) index pairs from the
+        source to the target index, or None if they are not connected.
+        """
+        if not connected(self.source, target):
+            return None
+
+        parents = self.parents
+        while parents[target] == SearchTree.UNREACHED and self.frontier:
+            person = self.frontier.popleft()
+            for movie, neighbor in neighbors_for_index(person):
+                if parents[neighbor] == SearchTree.UNREACHED:
+                    parents[neighbor] = person
+                    self.movies[neighbor] = movie
+                    self.frontier.append(neighbor)
+
+        if parents[target] == SearchTree.UNREACHED:
+            return None
+
+        path = []
+        person = target
+        while person != self.source:
+            path.append((self.movies[person], person))
+            person = parents[person]
+        path.reverse()
+        return path
+
+
+def connected(source, target):
+    """
+    Returns True if the person indices are in the same component,
+    that is, if there is any path between them.
+    """
+    return components[source] == components[target]
+
+
+def component_size(person_id):
+    """
+    Returns the number of people connected to a person, including them.
+    """
+    return component_sizes[components[person_index[person_id]]]
+
+
+def largest_components(n=None):
+    """
+    Returns the sizes of the n largest components (or of all of them),
+    largest first.
+    """
+    return sorted(component_sizes, reverse=True)[:n]
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
-    if len(person_ids) == 0:
+    matches = person_ids_for_name(name)
+    if len(matches) == 0:
         return None
-    elif len(person_ids) > 1:
+    elif len(matches) > 1:
         print(f"Which '{name}'?")
-        for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+        for person_id in matches:
+            person = person_index[person_id]
+            name = person_names[person]
+            birth = person_births[person]
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
-            if person_id in person_ids:
+            if person_id in matches:
                 return person_id
         except ValueError:
             pass
         return None
     else:
-        return person_ids[0]
+        return matches[0]
+
+
+def person_ids_for_name(name):
+    """
+    Returns the IMDB ids of every person with the given name, ignoring
+    case, accents and spacing, found by binary search of the name index.
+    """
+    key = fold_name(name)
+    start = bisect.bisect_left(name_keys, key)
+    end = bisect.bisect_right(name_keys, key, start)
+    return [person_ids[person] for person in name_order[start:end]]
+
+
+def search_names(query, limit=10):
+    """
+    Returns up to limit IMDB ids of people whose name starts with query,
+    ignoring case, accents and spacing. Exact matches come first, then
+    people in more movies.
+    """
+    key = fold_name(query)
+    start = bisect.bisect_left(name_keys, key)
+    exact = bisect.bisect_right(name_keys, key, start)
+    end = bisect.bisect_left(name_keys, key + chr(sys.maxunicode), exact)
+
+    best = most_popular(start, exact, limit)
+    best += most_popular(exact, end, limit - len(best))
+    return [person_ids[name_order[i]] for i in best]
+
+
+def most_popular(start, end, limit):
+    """
+    Returns up to limit positions in the name index from start to end,
+    of the people in the most movies, ties in index order.
+    """
+    if limit <= 0 or start >= end:
+        return []
+
+    # A large range is met early walking the index in order of popularity;
+    # stop walking once that has cost about as much as ranking it
+    if end - start > NAME_CANDIDATES:
+        found = []
+        for i in itertools.islice(name_popularity, 8 * (end - start)):
+            if start <= i < end:
+                found.append(i)
+                if len(found) == limit:
+                    return found
+
+    def rank(i):
+        person = name_order[i]
+        return (person_offsets[person] - person_offsets[person + 1], i)
+
+    return heapq.nsmallest(limit, range(start, end), key=rank)
+
+
+def resolve_names(queries, limit=10):
+    """
+    Returns the search_names candidates for each of queries, in order.
+    """
+    return [search_names(query, limit) for query in queries]
+
+
+def fold_name(name):
+    """
+    Returns name in the form the name index is keyed by: accents removed,
+    case folded and runs of whitespace collapsed to single spaces.
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
 
 
 def neighbors_for_person(person_id):
@@ -164,13 +822,87 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
     neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
+    for movie, person in movie_neighbors(person_index[person_id]):
+        neighbors.add((movie_ids[movie], person_ids[person]))
     return neighbors
 
 
+def neighbors_for_index(person):
+    """
+    Returns an iterable of (movie, person) index pairs for people who
+    starred with the person at a given index.
+
+    Once build_costars has run, each co-star appears once, with one movie
+    they share. Until then, a co-star appears once per shared movie.
+    """
+    if costar_offsets:
+        start, end = costar_offsets[person], costar_offsets[person + 1]
+        return zip(costar_movies[start:end], costar_people[start:end])
+    return movie_neighbors(person)
+
+
+def movie_neighbors(person):
+    """
+    Yields (movie, person) index pairs for everyone in each movie of the
+    person at a given index, straight from the CSR arrays.
+    """
+    start, end = person_offsets[person], person_offsets[person + 1]
+    for movie in person_movies[start:end]:
+        for costar in movie_stars[movie_offsets[movie]:movie_offsets[movie + 1]]:
+            yield movie, costar
+
+
+def build_costars(processes=None):
+    """
+    Builds the person-to-person adjacency used by neighbors_for_index,
+    split over processes worker processes (default: one per CPU).
+    """
+    global costar_offsets, costar_people, costar_movies
+
+    size = len(person_ids)
+    processes = processes or os.cpu_count() or 1
+    chunk = -(-size // processes) if size else 1
+    ranges = [(start, min(start + chunk, size)) for start in range(0, size, chunk)]
+
+    # Workers need the loaded data, which only forked processes inherit
+    if processes > 1 and "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        with context.Pool(processes) as pool:
+            parts = pool.starmap(costars_between, ranges)
+    else:
+        parts = [costars_between(start, end) for start, end in ranges]
+
+    offsets = array("i", [0])
+    people = array("i")
+    movies = array("i")
+    for counts, part_people, part_movies in parts:
+        for count in counts:
+            offsets.append(offsets[-1] + count)
+        people.extend(part_people)
+        movies.extend(part_movies)
+
+    costar_offsets, costar_people, costar_movies = offsets, people, movies
+
+
+def costars_between(start, end):
+    """
+    Returns (counts, people, movies) arrays of the distinct co-stars of
+    person indices start to end - 1, and a movie shared with each.
+    """
+    counts = array("i")
+    people = array("i")
+    movies = array("i")
+    for person in range(start, end):
+        witnesses = {}
+        for movie, costar in movie_neighbors(person):
+            if costar != person and costar not in witnesses:
+                witnesses[costar] = movie
+        counts.append(len(witnesses))
+        people.extend(witnesses.keys())
+        movies.extend(witnesses.values())
+    return counts, people, movies
+
+
 if __name__ == "__main__":
     main()
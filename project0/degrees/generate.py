@@ -0,0 +1,110 @@
+"""
+Generates a synthetic IMDB-like dataset for degrees.py.
+
+Cast sizes follow a power law, as do how many movies each person is
+in, so a few people are in hundreds of movies and most in one or two.
+The same seed always generates the same dataset.
+"""
+
+import argparse
+import csv
+import itertools
+import os
+import random
+
+FIRST_NAMES = [
+    "Alex", "Ana", "Ben", "Carla", "Chen", "David", "Elena", "Emma",
+    "Fatima", "Frank", "Grace", "Hiro", "Ian", "Isabel", "Jack", "José",
+    "Julia", "Kevin", "Laura", "Leo", "Maria", "Mohammed", "Nina", "Omar",
+    "Paul", "Priya", "Rosa", "Sam", "Sophie", "Tom", "Yuki", "Zoë",
+]
+LAST_NAMES = [
+    "Adams", "Bacon", "Brown", "Castro", "Cruise", "Davis", "Dubois",
+    "Evans", "García", "Hanks", "Ito", "Jones", "Kim", "Kowalski", "Lee",
+    "López", "Martin", "Müller", "Nguyen", "Novak", "Olsen", "Patel",
+    "Rossi", "Sato", "Schmidt", "Silva", "Smith", "Taylor", "Wang",
+    "Wilson", "Wright", "Zhang",
+]
+
+# Exponents of the power laws for cast sizes and for how often
+# each person is cast
+CAST_EXPONENT = 2.3
+POPULARITY_EXPONENT = 0.6
+
+# Largest cast a movie can have
+MAX_CAST = 60
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("directory", help="directory to write the CSV files to")
+    parser.add_argument("--people", type=int, default=1_000_000)
+    parser.add_argument("--movies", type=int,
+                        help="number of movies (default: a third of people)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    movies = args.movies if args.movies is not None else args.people // 3
+    generate(args.directory, args.people, movies, args.seed)
+
+
+def generate(directory, people, movies, seed=0):
+    """
+    Writes people.csv, movies.csv and stars.csv to directory.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, "people.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for person in range(people):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            if rng.random() < 0.5:
+                name += f" {person}"
+            writer.writerow([person_id(person), name, rng.randint(1900, 2005)])
+
+    with open(os.path.join(directory, "movies.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for movie in range(movies):
+            writer.writerow([movie_id(movie), f"Movie {movie}", rng.randint(1920, 2024)])
+
+    # Person i is cast with weight proportional to 1 / (i + 1) ** exponent,
+    # shuffled so popularity is not tied to id order
+    popularity = list(itertools.accumulate(
+        1 / (i + 1) ** POPULARITY_EXPONENT for i in range(people)
+    ))
+    ranking = list(range(people))
+    rng.shuffle(ranking)
+
+    with open(os.path.join(directory, "stars.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie in range(movies):
+            size = cast_size(rng)
+            cast = set(rng.choices(ranking, cum_weights=popularity, k=size))
+            for person in sorted(cast):
+                writer.writerow([person_id(person), movie_id(movie)])
+
+
+def cast_size(rng):
+    """
+    Returns a random cast size from a discrete power law on 1 to MAX_CAST.
+    """
+    return min(int(rng.paretovariate(CAST_EXPONENT - 1)), MAX_CAST)
+
+
+def person_id(person):
+    return str(100 + person)
+
+
+def movie_id(movie):
+    return str(1_000_000 + movie)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Long-running degrees query server.
+
+Loads the data once, then answers JSON queries over localhost HTTP from
+any number of clients at once, one thread per request:
+
+    GET /people?name=Kevin+Bacon
+    GET /search?name=kevin+ba&limit=5
+    GET /path?source=102&target=158
+    POST /paths {"pairs": [["102", "158"], ["102", "129"]]}
+
+Every response includes the time taken to answer it, in milliseconds.
+"""
+
+import json
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+
+HOST = "127.0.0.1"
+PORT = 8050
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python server.py [directory] [port]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    port = int(sys.argv[2]) if len(sys.argv) == 3 else PORT
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    server = ThreadingHTTPServer((HOST, port), QueryHandler)
+    print(f"Serving on http://{HOST}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def people(query):
+    """
+    Returns every person matching query["name"].
+    """
+    return {
+        "people": [
+            describe_person(person_id)
+            for person_id in degrees.person_ids_for_name(query["name"])
+        ]
+    }
+
+
+def search(query):
+    """
+    Returns the best-ranked people whose name starts with query["name"].
+    """
+    limit = int(query.get("limit", 10))
+    return {
+        "people": [
+            describe_person(person_id)
+            for person_id in degrees.search_names(query["name"], limit)
+        ]
+    }
+
+
+def path(query):
+    """
+    Returns the shortest path between query["source"] and query["target"].
+    """
+    source, target = query["source"], query["target"]
+    for person_id in (source, target):
+        if person_id not in degrees.person_index:
+            raise LookupError(f"unknown person {person_id}")
+
+    path = degrees.shortest_path(source, target, bidirectional=True)
+    if path is None:
+        return {"degrees": None, "path": None}
+    return {
+        "degrees": len(path),
+        "path": [
+            {
+                "movie": describe_movie(movie_id),
+                "person": describe_person(person_id),
+            }
+            for movie_id, person_id in path
+        ],
+    }
+
+
+def paths(query):
+    """
+    Returns the shortest path for each [source, target] in query["pairs"].
+    """
+    pairs = [(source, target) for source, target in query["pairs"]]
+    for pair in pairs:
+        for person_id in pair:
+            if person_id not in degrees.person_index:
+                raise LookupError(f"unknown person {person_id}")
+
+    return {
+        "paths": [
+            None if path is None else [
+                {"movie": movie_id, "person": person_id}
+                for movie_id, person_id in path
+            ]
+            for path in degrees.shortest_paths(pairs)
+        ]
+    }
+
+
+def describe_person(person_id):
+    person = degrees.person_index[person_id]
+    return {
+        "id": person_id,
+        "name": degrees.person_names[person],
+        "birth": degrees.person_births[person],
+    }
+
+
+def describe_movie(movie_id):
+    movie = degrees.movie_index[movie_id]
+    return {
+        "id": movie_id,
+        "title": degrees.movie_titles[movie],
+        "year": degrees.movie_years[movie],
+    }
+
+
+# Maps request paths to the functions that answer them
+ROUTES = {
+    "/people": people,
+    "/search": search,
+    "/path": path,
+}
+POST_ROUTES = {
+    "/paths": paths,
+}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlparse(self.path)
+        query = {
+            key: values[-1] for key, values in parse_qs(url.query).items()
+        }
+
+        self.answer(ROUTES.get(url.path), query, start)
+
+    def do_POST(self):
+        start = time.perf_counter()
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            query = json.loads(self.rfile.read(length))
+        except ValueError:
+            return self.reply(400, {"error": "body must be JSON"}, start)
+
+        self.answer(POST_ROUTES.get(url.path), query, start)
+
+    def answer(self, route, query, start):
+        if route is None:
+            return self.reply(404, {"error": "no such query"}, start)
+
+        try:
+            body = route(query)
+        except KeyError as e:
+            return self.reply(400, {"error": f"missing parameter {e}"}, start)
+        except LookupError as e:
+            return self.reply(404, {"error": str(e)}, start)
+        except (TypeError, ValueError):
+            return self.reply(400, {"error": "malformed query"}, start)
+        self.reply(200, body, start)
+
+    def reply(self, status, body, start):
+        body["latency_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        sys.stderr.write(f"{self.address_string()} {format % args}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Binary snapshots of the parsed degrees dataset.
+
+A snapshot is a header followed by named sections, each either an array
+of 32-bit integers or a list of strings. Sections are read straight off
+a memory map of the file: integer sections as memoryviews, and string
+sections as sequences that decode each string when it is accessed, so
+opening a snapshot costs next to nothing until its pages are touched.
+
+Layout (native byte order):
+    magic, version, section count
+    per section: name, kind, item count, offset, length in bytes
+    section data, each starting on an 8-byte boundary
+
+The data of a string section is item count + 1 64-bit byte offsets
+followed by the UTF-8 encoded strings back to back.
+"""
+
+import mmap
+import os
+import struct
+from array import array
+
+MAGIC = b"DEGREES\0"
+
+# Bump whenever the layout or the sections written by degrees.py change
+VERSION = 4
+
+HEADER = struct.Struct("=8sII")
+ENTRY = struct.Struct("=24s1sxxxQQQ")
+
+INTEGERS = b"i"
+STRINGS = b"s"
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class Strings():
+    """
+    Read-only sequence of the strings in a string section.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string index out of range")
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+
+def is_fresh(path, sources):
+    """
+    Returns True if the snapshot at path exists and is newer
+    than every one of the source files.
+    """
+    try:
+        modified = os.path.getmtime(path)
+        return all(os.path.getmtime(source) <= modified for source in sources)
+    except OSError:
+        return False
+
+
+def write(path, sections):
+    """
+    Writes a dict of name -> array("i") or list of str to path.
+
+    The file is written under a temporary name and moved into place,
+    so a reader never sees a partial snapshot.
+    """
+    entries = []
+    blobs = []
+    offset = HEADER.size + ENTRY.size * len(sections)
+    for name, values in sections.items():
+        if isinstance(values, array):
+            if values.typecode != "i" or values.itemsize != 4:
+                raise SnapshotError(f"section {name} must be array('i')")
+            kind, blob = INTEGERS, values.tobytes()
+        else:
+            kind, blob = STRINGS, encode_strings(values)
+        offset += -offset % 8
+        entries.append(ENTRY.pack(
+            name.encode("ascii"), kind, len(values), offset, len(blob)
+        ))
+        blobs.append((offset, blob))
+        offset += len(blob)
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(sections)))
+        for entry in entries:
+            f.write(entry)
+        for offset, blob in blobs:
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(blob)
+    os.replace(temporary, path)
+
+
+def encode_strings(values):
+    """
+    Returns the data of a string section holding values.
+    """
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = array("q", [0])
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    return offsets.tobytes() + b"".join(encoded)
+
+
+def read(path):
+    """
+    Returns the dict of sections stored at path, backed by a read-only
+    memory map of the file.
+
+    Raises SnapshotError if the file is not a snapshot of this version.
+    """
+    with open(path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise SnapshotError("empty snapshot")
+
+    if len(data) < HEADER.size:
+        raise SnapshotError("truncated snapshot")
+    magic, version, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise SnapshotError("not a snapshot of this version")
+
+    view = memoryview(data)
+    sections = {}
+    for i in range(count):
+        name, kind, items, offset, length = ENTRY.unpack_from(
+            data, HEADER.size + ENTRY.size * i
+        )
+        name = name.rstrip(b"\0").decode("ascii")
+        if offset + length > len(data):
+            raise SnapshotError(f"truncated section {name}")
+        section = view[offset:offset + length]
+        if kind == INTEGERS:
+            sections[name] = section.cast("i")
+        else:
+            split = 8 * (items + 1)
+            sections[name] = Strings(section[:split].cast("q"), section[split:])
+    return sections
@@ -1,4 +1,11 @@
+import bisect
+from array import array
+from collections import deque
+
+
 class Node():
+    __slots__ = ("state", "parent", "action")
+
     def __init__(self, state, parent, action):
         self.state = state
         self.parent = parent
@@ -6,33 +13,122 @@ class Node():
 
 
 class StackFrontier():
+    """
+    Last-in first-out frontier.
+
+    Nodes are kept in a deque alongside a count of their states, so that
+    add, remove and contains_state are all O(1).
+    """
+
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
 
+    def _forget(self, state):
+        count = self.states[state]
+        if count == 1:
+            del self.states[state]
+        else:
+            self.states[state] = count - 1
+
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self._forget(node.state)
             return node
 
 
 class QueueFrontier(StackFrontier):
+    """
+    First-in first-out frontier.
+    """
 
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self._forget(node.state)
             return node
+
+
+class SortedIndex():
+    """
+    Read-only mapping from keys to their positions in `keys`, found by
+    binary search of `order`, the positions sorted by key. Unlike a dict
+    it needs no memory beyond `order`, which can live in a snapshot.
+    """
+
+    def __init__(self, keys, order):
+        self.keys = keys
+        self.order = order
+
+    def __len__(self):
+        return len(self.order)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+            return True
+        except KeyError:
+            return False
+
+    def __getitem__(self, key):
+        i = bisect.bisect_left(self.order, key, key=self.keys.__getitem__)
+        if i < len(self.order) and self.keys[self.order[i]] == key:
+            return self.order[i]
+        raise KeyError(key)
+
+
+class UnionFind():
+    """
+    Disjoint sets over the integers 0 to size - 1,
+    with union by size and path halving.
+    """
+
+    def __init__(self, size):
+        self.parents = array("i", range(size))
+        self.sizes = array("i", [1]) * size
+
+    def find(self, item):
+        parents = self.parents
+        while parents[item] != item:
+            parents[item] = parents[parents[item]]
+            item = parents[item]
+        return item
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.sizes[a] < self.sizes[b]:
+            a, b = b, a
+        self.parents[b] = a
+        self.sizes[a] += self.sizes[b]
+
+    def labels(self):
+        """
+        Returns (labels, sizes) arrays, where labels[item] numbers the
+        set containing item from 0 upwards and sizes[label] is its size.
+        """
+        labels = array("i", [-1]) * len(self.parents)
+        sizes = array("i")
+        for item in range(len(self.parents)):
+            root = self.find(item)
+            if labels[root] == -1:
+                labels[root] = len(sizes)
+                sizes.append(self.sizes[root])
+            labels[item] = labels[root]
+        return labels, sizes
@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+
+import bitboard
+import search
+from bitboard import Bitboard
+
+# Board searched, as (rows, cols, k), and the cells (i, j) X and O hold,
+# which the serial search solves in a few seconds
+SHAPE = (4, 4, 4)
+X_CELLS = [(1, 1)]
+O_CELLS = [(2, 2)]
+
+# Numbers of worker processes to compare, 1 being the serial search
+PROCESSES = [1, 2, 4, 8]
+
+# Budget for the latency test, in seconds, and the number of moves timed
+TIME_LIMIT = 0.3
+MOVES = 5
+
+# Budget for solving the position, long enough for any worker count
+SOLVE_LIMIT = 600.0
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python bench_search.py [max processes]")
+    limit = int(sys.argv[1]) if len(sys.argv) == 2 else max(PROCESSES)
+    counts = [count for count in PROCESSES if count <= limit]
+
+    geometry = bitboard.geometry(*SHAPE)
+    position = Bitboard(cells(X_CELLS, geometry), cells(O_CELLS, geometry), geometry)
+    print(f"{os.cpu_count()} CPUs")
+
+    print(f"Choosing a move with a {TIME_LIMIT}s budget, worst of {MOVES}:")
+    for count in counts:
+        worst = max(time_move(position, TIME_LIMIT, count) for _ in range(MOVES))
+        print(f"  {count} processes: {worst:.3f}s")
+
+    print(f"Solving the {SHAPE[0]}x{SHAPE[1]} board, k={SHAPE[2]}:")
+    serial = None
+    for count in counts:
+        stats = bitboard.SearchStats()
+        with bitboard.counting(stats):
+            seconds = time_move(position, SOLVE_LIMIT, count)
+        serial = serial or seconds
+        print(f"  {count} processes: {seconds:.3f}s ({serial / seconds:.2f}x), "
+              f"{stats.nodes} nodes")
+
+
+def cells(pairs, geometry):
+    """
+    Returns the bits of the cells (i, j) in pairs.
+    """
+    return sum(1 << (i * geometry.cols + j) for i, j in pairs)
+
+
+def time_move(position, time_limit, processes):
+    """
+    Returns the seconds parallel_best_move takes to choose a move, with
+    its worker pool already started.
+    """
+    if processes > 1:
+        search.worker_pool(processes)
+    start = time.perf_counter()
+    search.parallel_best_move(position, time_limit, processes)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
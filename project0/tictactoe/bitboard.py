@@ -0,0 +1,435 @@
+"""
+Bitboard engine for Tic Tac Toe.
+
+A position is two integers: the cells held by X and the cells held by O,
+with cell (i, j) at bit cols * i + j. Moves are made and unmade by
+flipping one bit, and wins are found with precomputed masks, so search
+never copies or rescans a board.
+
+Positions default to the standard 3x3 board, which has its own exact
+search below. Other board sizes and win lengths are described by a
+Geometry and searched by search.py.
+
+Values are 1 for a win, -1 for a loss and 0 for a tie. The search
+itself is negamax, scoring from the point of view of the player to move;
+max_value, min_value, best_move and principal_variation give values from
+X's point of view.
+"""
+
+import contextlib
+import functools
+import math
+import time
+
+# Every cell set
+FULL = 0b111111111
+
+# The rows, columns and diagonals, as bit masks
+LINES = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+]
+
+# WINNING[bits] is True if the set of cells bits contains a whole line
+WINNING = [any(bits & line == line for line in LINES) for bits in range(FULL + 1)]
+
+# The 8 rotations and reflections of the board. Cells are numbered
+# 3 * i + j, and each symmetry lists the cell that moves to cell 0, 1, ...
+SYMMETRIES = [
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),  # Identity
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),  # Rotate 90 degrees clockwise
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),  # Rotate 180 degrees
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),  # Rotate 90 degrees anticlockwise
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),  # Reflect left to right
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),  # Reflect top to bottom
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),  # Reflect in the main diagonal
+    (8, 5, 2, 7, 4, 1, 6, 3, 0),  # Reflect in the anti-diagonal
+]
+
+# TRANSFORMS[s][bits] is the set of cells bits under symmetry s
+TRANSFORMS = [
+    [
+        sum(1 << n for n, cell in enumerate(symmetry) if bits >> cell & 1)
+        for bits in range(FULL + 1)
+    ]
+    for symmetry in SYMMETRIES
+]
+
+# THREES[bits] is the sum of 3 ** n over the cells n in bits
+THREES = [
+    sum(3 ** n for n in range(9) if bits >> n & 1)
+    for bits in range(FULL + 1)
+]
+
+# Kinds of value stored in the transposition table: the exact minimax
+# value, or a lower or upper bound on it from an alpha-beta cutoff.
+# Values there are from the point of view of the player to move, which
+# the number of pieces in a key determines
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Maps canonical position keys to (value, kind) of positions already searched
+transpositions = {}
+
+# The SearchStats that searches add their counts to, or None to count nothing
+stats = None
+
+
+class SearchStats():
+    """
+    Counts of the work done by searches: positions visited, alpha-beta
+    cutoffs, tests for a line or a full board, transposition table hits,
+    moves answered from the opening book, and the seconds taken.
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.cutoffs = 0
+        self.terminal_checks = 0
+        self.cache_hits = 0
+        self.book_hits = 0
+        self.elapsed = 0.0
+
+    def __str__(self):
+        return (f"{self.nodes} nodes, {self.cutoffs} cutoffs, "
+                f"{self.terminal_checks} terminal checks, "
+                f"{self.cache_hits} cache hits, {self.book_hits} book hits, "
+                f"{self.elapsed * 1000:.1f} ms")
+
+    def add(self, other):
+        """
+        Adds the counts of another SearchStats, though not its time.
+        """
+        self.nodes += other.nodes
+        self.cutoffs += other.cutoffs
+        self.terminal_checks += other.terminal_checks
+        self.cache_hits += other.cache_hits
+        self.book_hits += other.book_hits
+
+
+@contextlib.contextmanager
+def counting(search_stats):
+    """
+    Adds the counts and time of the searches run inside the with block to
+    search_stats, unless it is None.
+    """
+    global stats
+    if search_stats is None:
+        yield
+        return
+
+    stats = search_stats
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        search_stats.elapsed += time.perf_counter() - start
+        stats = None
+
+
+class Geometry():
+    """
+    A board of rows by cols cells, won by k in a row.
+    """
+
+    # Boards with at most this many cells look wins up in a table
+    TABLE_CELLS = 12
+
+    def __init__(self, rows, cols, k):
+        if not 1 <= k <= max(rows, cols):
+            raise ValueError("win length must fit on the board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.cells = rows * cols
+        self.full = (1 << self.cells) - 1
+
+        # Every run of k cells across, down or diagonally, as a bit mask
+        self.lines = []
+        for i in range(rows):
+            for j in range(cols):
+                for di, dj in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_i, end_j = i + di * (k - 1), j + dj * (k - 1)
+                    if 0 <= end_i < rows and 0 <= end_j < cols:
+                        self.lines.append(sum(
+                            1 << (cols * (i + di * n) + j + dj * n)
+                            for n in range(k)
+                        ))
+
+        # The lines through each cell
+        self.lines_through = [
+            [line for line in self.lines if line >> cell & 1]
+            for cell in range(self.cells)
+        ]
+
+        # Single-bit masks of the cells, those on the most lines first
+        # and then those nearest the centre: on the standard board the
+        # centre, then the corners, then the edges
+        centre_i, centre_j = (rows - 1) / 2, (cols - 1) / 2
+        self.order = [
+            1 << cell for cell in sorted(
+                range(self.cells),
+                key=lambda cell: (-len(self.lines_through[cell]),
+                                  (cell // cols - centre_i) ** 2
+                                  + (cell % cols - centre_j) ** 2)
+            )
+        ]
+
+        if self.cells <= Geometry.TABLE_CELLS:
+            table = [self.scan(bits) for bits in range(self.full + 1)]
+            self.has_line = table.__getitem__
+        else:
+            self.has_line = self.scan
+
+    def scan(self, bits):
+        """
+        Returns True if the set of cells bits contains a whole line.
+        """
+        return any(bits & line == line for line in self.lines)
+
+    def wins(self, bits, cell):
+        """
+        Returns True if the set of cells bits contains a whole line through
+        cell, which is all that needs checking after a move there.
+        """
+        return any(bits & line == line for line in self.lines_through[cell])
+
+
+@functools.lru_cache(maxsize=None)
+def geometry(rows, cols, k):
+    """
+    Returns the shared Geometry of a board size and win length.
+    """
+    return Geometry(rows, cols, k)
+
+
+# The standard 3x3 board, won by 3 in a row
+STANDARD = geometry(3, 3, 3)
+
+
+class Bitboard():
+    __slots__ = ("x", "o", "geometry")
+
+    def __init__(self, x=0, o=0, geometry=STANDARD):
+        self.x = x
+        self.o = o
+        self.geometry = geometry
+
+    def x_to_move(self):
+        """
+        Returns True if it is X's turn, False if it is O's.
+        """
+        return self.x.bit_count() == self.o.bit_count()
+
+    def empty(self):
+        """
+        Returns the set of empty cells.
+        """
+        return self.geometry.full & ~(self.x | self.o)
+
+    def winner(self):
+        """
+        Returns 1 if X has a line, -1 if O has, otherwise 0.
+        """
+        if self.geometry.has_line(self.x):
+            return 1
+        if self.geometry.has_line(self.o):
+            return -1
+        return 0
+
+    def terminal(self):
+        return (self.geometry.has_line(self.x)
+                or self.geometry.has_line(self.o)
+                or self.x | self.o == self.geometry.full)
+
+    def play(self, bit):
+        """
+        Makes the move of the player to move on the cell with the given bit.
+        """
+        if self.x_to_move():
+            self.x |= bit
+        else:
+            self.o |= bit
+
+    def undo(self, bit):
+        """
+        Takes back the move on the cell with the given bit.
+        """
+        self.x &= ~bit
+        self.o &= ~bit
+
+    def code(self):
+        """
+        Returns the base-3 number whose digit n is 0, 1 or 2 as
+        cell n is empty, held by X or held by O. Standard board only.
+        """
+        return THREES[self.x] + 2 * THREES[self.o]
+
+    def key(self):
+        """
+        Returns the same integer for a position and all its rotations and
+        reflections: the smallest of their 18-bit encodings. Standard
+        board only.
+        """
+        return min(
+            transform[self.x] | transform[self.o] << 9
+            for transform in TRANSFORMS
+        )
+
+
+def bits(cells):
+    """
+    Yields the single-bit masks of each cell in a set of cells.
+    """
+    while cells:
+        bit = cells & -cells
+        yield bit
+        cells ^= bit
+
+
+def max_value(board, alpha, beta):
+    """
+    Returns the minimax value of a standard position with X to move,
+    searched with alpha-beta pruning inside the window (alpha, beta).
+    """
+    return negamax(board, alpha, beta)
+
+
+def min_value(board, alpha, beta):
+    """
+    Returns the minimax value of a standard position with O to move,
+    searched with alpha-beta pruning inside the window (alpha, beta).
+    """
+    return -negamax(board, -beta, -alpha)
+
+
+def principal_variation(board):
+    """
+    Returns (value, moves) for a standard position that is not over:
+    its minimax value from X's point of view, and the single-bit masks
+    of the moves of a best line of play from it to the end of the game.
+    """
+    value = negamax(board, -math.inf, math.inf)
+    result = value if board.x_to_move() else -value
+    moves = []
+    while not board.terminal():
+        # The first move, in search order, that keeps the value
+        empty = board.empty()
+        for bit in STANDARD.order:
+            if bit & empty:
+                board.play(bit)
+                if -negamax(board, -math.inf, math.inf) == value:
+                    break
+                board.undo(bit)
+        moves.append(bit)
+        value = -value
+
+    for bit in moves:
+        board.undo(bit)
+    return result, moves
+
+
+def best_move(board):
+    """
+    Returns (value, bit) for a standard position that is not over: its
+    minimax value from X's point of view and the single-bit mask of a
+    move that achieves it. The window narrows as each move is searched,
+    so later moves only need proving no better than the best so far.
+    """
+    sign = 1 if board.x_to_move() else -1
+    alpha, beta = -math.inf, math.inf
+    best = None
+    empty = board.empty()
+    for bit in STANDARD.order:
+        if not bit & empty:
+            continue
+        board.play(bit)
+        value = -negamax(board, -beta, -alpha)
+        board.undo(bit)
+        if value > alpha:
+            alpha, best = value, bit
+            if alpha == 1:
+                break
+    return sign * alpha, best
+
+
+def negamax(board, alpha, beta):
+    """
+    Returns the minimax value of a standard position from the point of
+    view of the player to move, searched with alpha-beta pruning inside
+    the window (alpha, beta). Moves are tried centre first, then
+    corners, then edges, which finds the cutoffs soonest.
+    """
+    if stats is not None:
+        stats.nodes += 1
+        stats.terminal_checks += 1
+
+    # Over if the player who just moved has a line, or if the board is full
+    if board.x_to_move():
+        if WINNING[board.o]:
+            return -1
+    elif WINNING[board.x]:
+        return -1
+
+    if stats is not None:
+        stats.terminal_checks += 1
+    empty = FULL & ~(board.x | board.o)
+    if not empty:
+        return 0
+
+    key = board.key()
+    cached = lookup(key, alpha, beta)
+    if cached is not None:
+        if stats is not None:
+            stats.cache_hits += 1
+        return cached
+
+    value = -math.inf
+    window = (alpha, beta)
+
+    for bit in STANDARD.order:
+        if not bit & empty:
+            continue
+        board.play(bit)
+        value = max(value, -negamax(board, -beta, -alpha))
+        board.undo(bit)
+        alpha = max(alpha, value)
+        if alpha >= beta:
+            if stats is not None:
+                stats.cutoffs += 1
+            break
+
+    store(key, value, *window)
+    return value
+
+
+def lookup(key, alpha, beta):
+    """
+    Returns the value of the position with the given key if the
+    transposition table settles it for the window (alpha, beta),
+    otherwise None.
+    """
+    entry = transpositions.get(key)
+    if entry is None:
+        return None
+    value, kind = entry
+    if (kind == EXACT
+            or (kind == LOWER and value >= beta)
+            or (kind == UPPER and value <= alpha)):
+        return value
+    return None
+
+
+def store(key, value, alpha, beta):
+    """
+    Records the value found by searching a position with the window
+    (alpha, beta): exact if inside it, otherwise a bound.
+    """
+    if value <= alpha:
+        transpositions[key] = (value, UPPER)
+    elif value >= beta:
+        transpositions[key] = (value, LOWER)
+    else:
+        transpositions[key] = (value, EXACT)
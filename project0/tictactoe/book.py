@@ -0,0 +1,83 @@
+"""
+Builds the Tic Tac Toe opening book.
+
+Solves every position reachable from the empty board and writes the
+value and a best move of each to book.bin, which minimax then answers
+from instead of searching. Run this once after changing the engine:
+
+    python book.py
+"""
+
+import math
+import os
+
+import bitboard
+
+# Where minimax looks for the book
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+# Size of the book: one byte for each base-3 board code
+SIZE = 3 ** 9
+
+# Byte of positions that are unreachable or over
+NO_MOVE = 0xFF
+
+
+def main():
+    book = build()
+    with open(PATH, "wb") as f:
+        f.write(book)
+    solved = sum(entry != NO_MOVE for entry in book)
+    print(f"Wrote {solved} positions to {PATH}")
+
+
+def build():
+    """
+    Returns the book: for each board code, (value + 1) << 4 | best cell,
+    or NO_MOVE where there is nothing to play.
+    """
+    book = bytearray([NO_MOVE]) * SIZE
+    solve(bitboard.Bitboard(), book, set())
+    return bytes(book)
+
+
+def solve(position, book, seen):
+    """
+    Adds position and every position reachable from it to book.
+    """
+    code = position.code()
+    if code in seen or position.terminal():
+        return
+    seen.add(code)
+
+    x_to_move = position.x_to_move()
+    best_value, best_cell = None, None
+    for bit in bitboard.bits(position.empty()):
+        position.play(bit)
+        if x_to_move:
+            value = bitboard.min_value(position, -math.inf, math.inf)
+        else:
+            value = bitboard.max_value(position, -math.inf, math.inf)
+        solve(position, book, seen)
+        position.undo(bit)
+
+        if (best_value is None
+                or (x_to_move and value > best_value)
+                or (not x_to_move and value < best_value)):
+            best_value, best_cell = value, bit.bit_length() - 1
+
+    book[code] = (best_value + 1) << 4 | best_cell
+
+
+def entry(book, code):
+    """
+    Returns the (value, cell) of a board code in book, or None.
+    """
+    packed = book[code]
+    if packed == NO_MOVE:
+        return None
+    return (packed >> 4) - 1, packed & 0xF
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Retrograde analysis of the whole Tic Tac Toe state space.
+
+Every one of the 3 ** 9 boards is numbered by its base-3 code, as in
+Bitboard.code: digit n is 0, 1 or 2 as cell n = 3 * i + j is empty, held
+by X or held by O. The winner, whether the game is over, the minimax
+value and a best cell of every board are computed with NumPy at once,
+filling in values backwards from full boards to the empty one, so a
+batch of boards is scored by indexing rather than searching.
+
+Values are from X's point of view: 1 if X wins, -1 if O wins, 0 for a tie.
+"""
+
+import collections
+
+import numpy as np
+
+from tictactoe import X, O, EMPTY
+
+# Number of board codes
+SIZE = 3 ** 9
+
+# POWERS[n] is the place value of cell n in a code
+POWERS = 3 ** np.arange(9)
+
+# The rows, columns and diagonals, as cell numbers
+LINES = np.array([
+    [0, 1, 2], [3, 4, 5], [6, 7, 8],
+    [0, 3, 6], [1, 4, 7], [2, 5, 8],
+    [0, 4, 8], [2, 4, 6],
+])
+
+# Digit of each kind of cell
+DIGITS = {EMPTY: 0, X: 1, O: 2}
+
+# The arrays indexed by code: whether the board can arise in a game,
+# its winner and whether it is over, its minimax value, and a best cell
+# to play, or -1 where the game is over or cannot arise
+Solution = collections.namedtuple(
+    "Solution", ["valid", "winner", "terminal", "value", "best"]
+)
+
+# The solution, computed on first use
+solution = None
+
+
+def solve():
+    """
+    Returns the Solution of every board code.
+    """
+    codes = np.arange(SIZE)
+    digits = codes[:, None] // POWERS % 3
+    x, o = digits == 1, digits == 2
+    x_count, o_count = x.sum(axis=1), o.sum(axis=1)
+    x_to_move = x_count == o_count
+
+    x_wins = x[:, LINES].all(axis=2).any(axis=1)
+    o_wins = o[:, LINES].all(axis=2).any(axis=1)
+
+    # X moves first, and nobody moves after a win
+    valid = (
+        (x_to_move | (x_count == o_count + 1))
+        & ~(x_wins & (x_to_move | o_wins))
+        & ~(o_wins & ~x_to_move)
+    )
+    winner = (x_wins.astype(np.int8) - o_wins).astype(np.int8)
+    terminal = x_wins | o_wins | (x_count + o_count == 9)
+
+    value = np.where(valid, winner, 0).astype(np.int8)
+    best = np.full(SIZE, -1, dtype=np.int8)
+
+    # Boards with one more piece are solved before those with one less,
+    # so the children of each layer are always done
+    pieces = x_count + o_count
+    for count in range(8, -1, -1):
+        boards = np.nonzero((pieces == count) & valid & ~terminal)[0]
+        sign = np.where(x_to_move[boards], 1, -1)
+
+        # The code of each move's result; cells already taken
+        # score worse than any move
+        mover = np.where(x_to_move[boards], 1, 2)
+        empty = digits[boards] == 0
+        children = boards[:, None] + mover[:, None] * POWERS
+        scores = np.where(empty, value[np.where(empty, children, 0)] * sign[:, None], -2)
+
+        best[boards] = scores.argmax(axis=1)
+        value[boards] = scores.max(axis=1) * sign
+
+    return Solution(valid, winner, terminal, value, best)
+
+
+def tables():
+    """
+    Returns the Solution, solving the state space the first time.
+    """
+    global solution
+    if solution is None:
+        solution = solve()
+    return solution
+
+
+def encode(boards):
+    """
+    Returns the codes of a batch of boards, given either as boards of
+    X, O and EMPTY or as an integer array of shape (n, 3, 3) holding
+    0 for empty, 1 for X and 2 for O.
+    """
+    if isinstance(boards, np.ndarray) and boards.dtype.kind in "iu":
+        cells = boards
+    else:
+        cells = np.array([
+            [[DIGITS[cell] for cell in row] for row in board] for board in boards
+        ], dtype=np.int64)
+    return cells.reshape(len(cells), 9) @ POWERS
+
+
+def evaluate(boards):
+    """
+    Returns (values, actions) for a batch of boards: each board's value
+    under optimal play, and an optimal action (i, j) for the player to
+    move as a row of an (n, 2) array, or (-1, -1) if the game is over.
+    """
+    solved = tables()
+    codes = encode(boards)
+    if not solved.valid[codes].all():
+        raise Exception("Boards must be reachable in a game.")
+
+    cells = solved.best[codes].astype(np.int64)
+    actions = np.stack([cells // 3, cells % 3], axis=1)
+    actions[cells < 0] = -1
+    return solved.value[codes], actions
@@ -2,6 +2,7 @@ import pygame
 import sys
 import time
 
+import bitboard
 import tictactoe as ttt
 
 pygame.init()
@@ -16,11 +17,15 @@ screen = pygame.display.set_mode(size)
 mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+smallFont = pygame.font.Font("OpenSans-Regular.ttf", 14)
 
 user = None
 board = ttt.initial_state()
 ai_turn = False
 
+# Counts from the search for the computer's last move
+stats = None
+
 while True:
 
     for event in pygame.event.get():
@@ -108,11 +113,19 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
+        # Show how hard the computer searched for its last move
+        if stats is not None:
+            info = smallFont.render(str(stats), True, white)
+            infoRect = info.get_rect()
+            infoRect.center = ((width / 2), 65)
+            screen.blit(info, infoRect)
+
         # Check for AI move
         if user != player and not game_over:
             if ai_turn:
                 time.sleep(0.5)
-                move = ttt.minimax(board)
+                stats = bitboard.SearchStats()
+                move = ttt.minimax(board, stats=stats)
                 board = ttt.result(board, move)
                 ai_turn = False
             else:
@@ -142,5 +155,6 @@ while True:
                     user = None
                     board = ttt.initial_state()
                     ai_turn = False
+                    stats = None
 
     pygame.display.flip()
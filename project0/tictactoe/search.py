@@ -0,0 +1,405 @@
+"""
+Time-bounded search for boards of any size and win length.
+
+Negamax with alpha-beta pruning, deepened one ply at a time until the
+wall-clock budget runs out; the move chosen is the best one found by
+the deepest search that finished. Each iteration tries first the moves
+that did best in the one before, and positions at the depth limit are
+scored by counting the lines each player could still complete.
+
+Scores are from the point of view of the player to move.
+
+parallel_best_move splits each iteration's root moves over a pool of
+worker processes instead, which share the best root score so far.
+"""
+
+import atexit
+import multiprocessing
+import os
+import time
+
+import bitboard
+from bitboard import Bitboard
+
+# Score of a win on the next move; a win n moves later scores WIN - n
+WIN = 1_000_000
+
+# Default wall-clock budget for choosing a move, in seconds
+TIME_LIMIT = 1.0
+
+# Nodes searched between checks of the clock
+CHECK_EVERY = 1024
+
+# Kinds of score stored in the table: exact, or a lower or upper bound
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+
+class Timeout(Exception):
+    pass
+
+
+def best_move(position, time_limit=TIME_LIMIT):
+    """
+    Returns the single-bit mask of the best cell to play in a position
+    that is not over, found within time_limit seconds.
+    """
+    move, _, _ = Search(position, time.perf_counter() + time_limit).run()
+    return move
+
+
+def parallel_best_move(position, time_limit=TIME_LIMIT, processes=None):
+    """
+    Returns a move as best_move does, searching the root moves of each
+    iteration in processes worker processes (default: one per CPU),
+    whose counts are added to bitboard.stats.
+
+    Each iteration searches the move that was best in the one before
+    first, alone, and then the others in parallel, each only trying to
+    beat the best score found so far by any worker. Of the moves with
+    the best score, the first in the geometry's order is chosen, so
+    only a move that merely matched the best when searched, and comes
+    before every move known to score it, is searched again. Only
+    iterations every move finished count.
+
+    The worker processes are started on first use and kept for later
+    calls, which must not overlap.
+    """
+    global searches
+    deadline = time.perf_counter() + time_limit
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return best_move(position, time_limit)
+
+    pool, bound = worker_pool(processes)
+    searches += 1
+
+    geometry = position.geometry
+    task = (searches, position.x, position.o,
+            (geometry.rows, geometry.cols, geometry.k), deadline)
+    counting = bitboard.stats is not None
+    rank = {bit: n for n, bit in enumerate(geometry.order)}
+    empty = position.empty()
+    moves = [bit for bit in geometry.order if bit & empty]
+    move = moves[0]
+
+    def search_moves(bits, depth, alpha=None):
+        """
+        Returns a list of (score, exact) for root moves bits searched to
+        depth in the pool, the first of them alone, or None if the
+        deadline passed.
+        """
+        tasks = [task + (bit, depth, counting, alpha) for bit in bits]
+        results = [pool.apply(search_root_move, tasks[0])]
+        if results[0][0] is not None:
+            results += pool.starmap(search_root_move, tasks[1:], chunksize=1)
+        if counting:
+            for _, _, counts in results:
+                bitboard.stats.add(counts)
+        if len(results) < len(bits) or any(score is None for score, _, _ in results):
+            return None
+        return [(score, exact) for score, exact, _ in results]
+
+    for depth in range(1, len(moves) + 1):
+        bound.value = -WIN - 1
+        results = search_moves(moves, depth)
+        if results is None:
+            break
+        scores = dict(zip(moves, results))
+        best = max(score for score, exact in results if exact)
+
+        # The first move in order scoring the best: one that only
+        # matched the bound it was searched with may score it too
+        tied = sorted((bit for bit in moves if scores[bit][0] == best), key=rank.get)
+        chosen = None
+        for bit in tied:
+            if scores[bit][1]:
+                chosen = bit
+                break
+            result = search_moves([bit], depth, best - 1)
+            if result is None:
+                break
+            if result[0][0] == best:
+                chosen = bit
+                break
+        if chosen is None:
+            break
+
+        # The best move first in the next iteration, the rest in order
+        move = chosen
+        moves.remove(move)
+        moves.insert(0, move)
+        if abs(best) > WIN - geometry.cells:
+            break
+
+    return move
+
+
+# The pool parallel_best_move runs in, its number of processes, the best
+# root score so far shared with its workers, and the number of searches
+# run in it
+pool = None
+pool_processes = 0
+pool_bound = None
+searches = 0
+
+
+def worker_pool(processes):
+    """
+    Returns (pool, bound): a pool of processes forked worker processes,
+    started the first time or when the number changes, and the value
+    its workers share the best root score through.
+    """
+    global pool, pool_processes, pool_bound
+    if pool is None or pool_processes != processes:
+        if pool is not None:
+            pool.terminate()
+        context = multiprocessing.get_context("fork")
+        pool_bound = context.Value("q", 0)
+        pool = context.Pool(processes, initializer=start_worker,
+                            initargs=(pool_bound,))
+        pool_processes = processes
+        atexit.register(pool.terminate)
+    return pool, pool_bound
+
+
+# In a worker process of parallel_best_move: the search it is running,
+# which search of the pool that is, and the best root score found so far
+# by any worker
+worker = None
+worker_search = None
+shared_bound = None
+
+
+def start_worker(bound):
+    global shared_bound
+    shared_bound = bound
+
+
+def search_root_move(number, x, o, shape, deadline, bit, depth, counting,
+                     alpha=None):
+    """
+    Returns (score, exact, counts) for root move bit from the position
+    (x, o) on a board of shape (rows, cols, k), searched to depth in a
+    worker process: its score, or None if the deadline passed, whether
+    the score is exact rather than an upper bound, and a SearchStats of
+    the search if counting. The worker keeps its table for the rest of
+    search number of the pool.
+
+    The window starts at alpha, by default the best score so far, which
+    a move must beat to get an exact score.
+    """
+    global worker, worker_search
+    if worker_search != number:
+        worker = Search(Bitboard(x, o, bitboard.geometry(*shape)), deadline)
+        worker_search = number
+    worker.stats = bitboard.SearchStats() if counting else None
+    if time.perf_counter() > deadline:
+        return None, False, worker.stats
+
+    worker.position.x, worker.position.o = x, o
+    if alpha is None:
+        alpha = shared_bound.value
+    try:
+        score = worker.move_score(bit, worker.position.x_to_move(), depth,
+                                  alpha, WIN + 1, 0)
+    except Timeout:
+        return None, False, worker.stats
+
+    with shared_bound.get_lock():
+        if score > shared_bound.value:
+            shared_bound.value = score
+    return score, score > alpha, worker.stats
+
+
+class Search():
+    """
+    One iterative-deepening search from a position, up to a deadline.
+    """
+
+    def __init__(self, position, deadline):
+        # Searched on a copy, which a timeout may leave mid-move
+        self.position = Bitboard(position.x, position.o, position.geometry)
+        self.geometry = position.geometry
+        self.deadline = deadline
+        self.nodes = 0
+        self.stats = bitboard.stats
+
+        # Maps (x, o) to (depth, score, kind, best move) of searched positions
+        self.table = {}
+
+        # Value of a line holding n of one player's pieces and none of the
+        # other's, for evaluating positions at the depth limit
+        self.weights = [0] + [4 ** n for n in range(self.geometry.k)]
+
+    def run(self):
+        """
+        Returns (move, score, depth) from the deepest iteration
+        that finished before the deadline.
+        """
+        empty = self.position.empty()
+        moves = [bit for bit in self.geometry.order if bit & empty]
+        move, score, completed = moves[0], 0, 0
+
+        for depth in range(1, len(moves) + 1):
+            try:
+                scores = self.root(depth, moves)
+            except Timeout:
+                break
+
+            # Try this iteration's best moves first in the next
+            moves.sort(key=lambda bit: -scores[bit])
+            move, score, completed = moves[0], scores[moves[0]], depth
+
+            # Stop once the result is certain
+            if abs(score) > WIN - self.geometry.cells:
+                break
+
+        return move, score, completed
+
+    def root(self, depth, moves):
+        """
+        Returns the score of each root move searched to depth, passing
+        the best score so far on as the window for the moves after it.
+        Moves that cannot beat it get an upper bound rather than a score.
+        """
+        position = self.position
+        x_to_move = position.x_to_move()
+        alpha, beta = -WIN - 1, WIN + 1
+        scores = {}
+        for bit in moves:
+            score = self.move_score(bit, x_to_move, depth, alpha, beta, 0)
+            scores[bit] = score
+            alpha = max(alpha, score)
+        return scores
+
+    def move_score(self, bit, x_to_move, depth, alpha, beta, ply):
+        """
+        Returns the score for the player to move of playing bit, searched
+        to depth within the window (alpha, beta).
+        """
+        position = self.position
+        cell = bit.bit_length() - 1
+        if x_to_move:
+            position.x |= bit
+            won = self.geometry.wins(position.x, cell)
+        else:
+            position.o |= bit
+            won = self.geometry.wins(position.o, cell)
+        if self.stats is not None:
+            self.stats.terminal_checks += 1
+
+        if won:
+            score = WIN - ply
+        else:
+            score = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+
+        position.x &= ~bit
+        position.o &= ~bit
+        return score
+
+    def negamax(self, depth, alpha, beta, ply):
+        """
+        Returns the score of the position for the player to move,
+        searched to depth within the window (alpha, beta).
+        """
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0 and time.perf_counter() > self.deadline:
+            raise Timeout
+        if self.stats is not None:
+            self.stats.nodes += 1
+
+        position = self.position
+        empty = position.empty()
+        if not empty:
+            return 0
+        if depth == 0:
+            return self.evaluate()
+
+        key = (position.x, position.o)
+        first = None
+        entry = self.table.get(key)
+        if entry is not None:
+            stored_depth, score, kind, first = entry
+            score = from_table(score, ply)
+            if stored_depth >= depth and (
+                    kind == EXACT
+                    or (kind == LOWER and score >= beta)
+                    or (kind == UPPER and score <= alpha)):
+                if self.stats is not None:
+                    self.stats.cache_hits += 1
+                return score
+
+        x_to_move = position.x_to_move()
+        window = (alpha, beta)
+        best_score, best = -WIN - 1, None
+        for bit in self.moves(empty, first):
+            score = self.move_score(bit, x_to_move, depth, alpha, beta, ply)
+            if score > best_score:
+                best_score, best = score, bit
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                if self.stats is not None:
+                    self.stats.cutoffs += 1
+                break
+
+        if best_score <= window[0]:
+            kind = UPPER
+        elif best_score >= window[1]:
+            kind = LOWER
+        else:
+            kind = EXACT
+        self.table[key] = (depth, to_table(best_score, ply), kind, best)
+        return best_score
+
+    def moves(self, empty, first):
+        """
+        Yields the empty cells in search order: first, if given,
+        then the rest in the geometry's order.
+        """
+        if first is not None and first & empty:
+            yield first
+        for bit in self.geometry.order:
+            if bit & empty and bit != first:
+                yield bit
+
+    def evaluate(self):
+        """
+        Returns a heuristic score for the player to move: the weight of
+        each line only they hold pieces in, less the same for the other.
+        """
+        x, o = self.position.x, self.position.o
+        weights = self.weights
+        score = 0
+        for line in self.geometry.lines:
+            xs, os = x & line, o & line
+            if xs and not os:
+                score += weights[xs.bit_count()]
+            elif os and not xs:
+                score -= weights[os.bit_count()]
+        return score if self.position.x_to_move() else -score
+
+
+def to_table(score, ply):
+    """
+    Returns a score as stored in the table: wins counted from the
+    position itself rather than from the root.
+    """
+    if score > WIN - 1000:
+        return score + ply
+    if score < -WIN + 1000:
+        return score - ply
+    return score
+
+
+def from_table(score, ply):
+    """
+    Returns a score read from the table counted from the root again.
+    """
+    if score > WIN - 1000:
+        return score - ply
+    if score < -WIN + 1000:
+        return score + ply
+    return score
@@ -0,0 +1,158 @@
+"""
+Checks the Tic Tac Toe engine against a plain minimax on every position
+reachable from the empty board.
+
+    python -m pytest test_tictactoe.py
+"""
+
+import functools
+
+import bitboard
+import book
+import tictactoe as ttt
+
+LINES = [
+    [(0, 0), (0, 1), (0, 2)], [(1, 0), (1, 1), (1, 2)], [(2, 0), (2, 1), (2, 2)],
+    [(0, 0), (1, 0), (2, 0)], [(0, 1), (1, 1), (2, 1)], [(0, 2), (1, 2), (2, 2)],
+    [(0, 0), (1, 1), (2, 2)], [(0, 2), (1, 1), (2, 0)],
+]
+
+
+def reference_winner(board):
+    for line in LINES:
+        a, b, c = (board[i][j] for i, j in line)
+        if a is not ttt.EMPTY and a == b == c:
+            return a
+    return None
+
+
+def reference_actions(board):
+    return [(i, j) for i in range(3) for j in range(3) if board[i][j] is ttt.EMPTY]
+
+
+def reference_player(board):
+    pieces = sum(cell is not ttt.EMPTY for row in board for cell in row)
+    return ttt.X if pieces % 2 == 0 else ttt.O
+
+
+def reference_result(board, action):
+    rows = [list(row) for row in board]
+    rows[action[0]][action[1]] = reference_player(board)
+    return tuple(tuple(row) for row in rows)
+
+
+@functools.lru_cache(maxsize=None)
+def reference_value(board):
+    """
+    Returns the minimax value of a board given as a tuple of tuples,
+    searched exhaustively without pruning.
+    """
+    winner = reference_winner(board)
+    if winner is not None:
+        return 1 if winner == ttt.X else -1
+    actions = reference_actions(board)
+    if not actions:
+        return 0
+    values = [reference_value(reference_result(board, action)) for action in actions]
+    return max(values) if reference_player(board) == ttt.X else min(values)
+
+
+def reachable():
+    """
+    Returns every board reachable from the empty board, as tuples.
+    """
+    empty = tuple(tuple(row) for row in ttt.initial_state())
+    seen = {empty}
+    frontier = [empty]
+    while frontier:
+        board = frontier.pop()
+        if reference_winner(board) is not None:
+            continue
+        for action in reference_actions(board):
+            child = reference_result(board, action)
+            if child not in seen:
+                seen.add(child)
+                frontier.append(child)
+    return seen
+
+
+BOARDS = reachable()
+
+
+def check_minimax():
+    for board in BOARDS:
+        rows = [list(row) for row in board]
+        over = (reference_winner(board) is not None
+                or not reference_actions(board))
+        assert ttt.terminal(rows) == over
+        if over:
+            assert ttt.minimax(rows) is None
+            continue
+        action = ttt.minimax(rows)
+        assert reference_value(reference_result(board, action)) == reference_value(board)
+
+
+def test_count():
+    assert len(BOARDS) == 5478
+
+
+def test_rules():
+    for board in BOARDS:
+        rows = [list(row) for row in board]
+        assert ttt.player(rows) == reference_player(board)
+        assert ttt.actions(rows) == set(reference_actions(board))
+        assert ttt.winner(rows) == reference_winner(board)
+        if ttt.terminal(rows):
+            assert ttt.utility(rows) == reference_value(board)
+
+
+def test_minimax_search():
+    ttt.opening_book, saved = b"", ttt.opening_book
+    bitboard.transpositions.clear()
+    try:
+        check_minimax()
+    finally:
+        ttt.opening_book = saved
+
+
+def test_minimax_book():
+    ttt.opening_book, saved = book.build(), ttt.opening_book
+    try:
+        check_minimax()
+    finally:
+        ttt.opening_book = saved
+
+
+def test_principal_variation():
+    for board in BOARDS:
+        rows = [list(row) for row in board]
+        value, actions = ttt.principal_variation(rows)
+        assert value == reference_value(board)
+
+        # Playing the line out ends the game with that value
+        for action in actions:
+            rows = ttt.result(rows, action)
+        assert ttt.terminal(rows)
+        assert ttt.utility(rows) == value
+
+
+def test_stats():
+    stats = bitboard.SearchStats()
+    bitboard.transpositions.clear()
+    ttt.opening_book, saved = b"", ttt.opening_book
+    try:
+        ttt.minimax(ttt.initial_state(), stats=stats)
+    finally:
+        ttt.opening_book = saved
+    assert stats.nodes > 0
+    assert stats.nodes < stats.terminal_checks < 2 * stats.nodes
+    assert stats.book_hits == 0
+    assert bitboard.stats is None
+
+    stats = bitboard.SearchStats()
+    ttt.opening_book, saved = book.build(), ttt.opening_book
+    try:
+        ttt.minimax(ttt.initial_state(), stats=stats)
+    finally:
+        ttt.opening_book = saved
+    assert stats.book_hits == 1 and stats.nodes == 0
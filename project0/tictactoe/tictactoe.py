@@ -2,174 +2,183 @@
 Tic Tac Toe Player
 """
 
-import math
-import copy
+import bitboard
+import book
+import search
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# The opening book written by book.py, loaded on first use,
+# or b"" if there is none
+opening_book = None
 
-def initial_state():
+
+def initial_state(rows=3, cols=3):
     """
     Returns starting state of the board.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return [[EMPTY] * cols for _ in range(rows)]
+
+
+def to_bitboard(board, k=None):
+    """
+    Returns the bitboard engine's position for a board, won by k in a row.
+    By default k is the length of the board's shorter side.
+    """
+    rows, cols = len(board), len(board[0])
+    geometry = bitboard.geometry(rows, cols, k or min(rows, cols))
+    position = bitboard.Bitboard(geometry=geometry)
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                position.x |= 1 << (cols * i + j)
+            elif cell == O:
+                position.o |= 1 << (cols * i + j)
+    return position
 
 
 def player(board):
     """
     Returns player who has the next turn on a board.
     """
-    # Find number of moves made on board, max number of moves is 9.
-    moves_made = 9 - sum([row.count(EMPTY) for row in board])
-    
     # X gets the first move, then player's turn alternate.
-    # If number of moves made is even then it is X's turn, otherwise it is O's turn.
-    if moves_made % 2 == 0:
-        return X
-    else:
-        return O
+    return X if to_bitboard(board).x_to_move() else O
 
 
 def actions(board):
     """
     Returns set of all possible actions (i, j) available on the board.
     """
-    possible_actions = set()
-
-    for row, values in enumerate(board):
-        for col, cell in enumerate(values):
-            if cell == EMPTY:
-                possible_actions.add((row, col))
-    
-    return possible_actions
+    cols = len(board[0])
+    return {
+        divmod(bit.bit_length() - 1, cols)
+        for bit in bitboard.bits(to_bitboard(board).empty())
+    }
 
 
 def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
-    # Check if action is possible or not based on possible actions 
+    # Check if action is possible or not based on possible actions
     possible_actions = actions(board)
 
     if action not in possible_actions:
         raise Exception("This move is invalid! Try another move.")
-    
-    # Deepcopy board and perform action on copied board
-    result = copy.deepcopy(board)
+
+    # Copy board and perform action on copied board
+    result = [row.copy() for row in board]
     result[action[0]][action[1]] = player(board)
 
     return result
 
 
-def winner(board):
+def winner(board, k=None):
     """
     Returns the winner of the game, if there is one.
-    """ 
-    # Vertical win
-    for i in range(0, 3):
-        if (board[0][i] != EMPTY and
-            board[0][i] == board[1][i] and
-            board[1][i] == board[2][i]):
-            return board[0][i]
-    # Horzintal win
-    for i in range(0, 3):
-        if (board[i][0] != EMPTY and
-            board[i][0] == board[i][1] and
-            board[i][1] == board[i][2]):
-            return board[i][0]
-    # Diagonal win
-    if (board[0][0] != EMPTY and
-        board[0][0] == board[1][1] and
-        board[1][1] == board[2][2]):
-        return board[0][0]
-    elif (board[0][2] != EMPTY and
-          board[0][2] == board[1][1] and
-          board[1][1] == board[2][0]):
-        return board[0][2]
-    return None
-
-
-def terminal(board):
+    """
+    return {1: X, -1: O, 0: None}[to_bitboard(board, k).winner()]
+
+
+def terminal(board, k=None):
     """
     Returns True if game is over, False otherwise.
     """
     # Return True if there is a winner or when there no possible actions anymore
-    if winner(board) or not actions(board):
-        return True
-    else:
-        return False
+    return to_bitboard(board, k).terminal()
 
 
-def utility(board):
+def utility(board, k=None):
     """
     Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
     """
-    if terminal(board): 
-        if winner(board) == X:
-            return 1
-        elif winner(board) == O:
-            return -1
-        else:
-            return 0
+    position = to_bitboard(board, k)
+    if position.terminal():
+        return position.winner()
 
 
-def minimax(board):
+def minimax(board, k=None, time_limit=None, processes=None, stats=None):
     """
     Returns the optimal action for the current player on the board.
+
+    The standard 3x3 board is searched to the end. Other boards, or any
+    board given a time_limit in seconds, get the best action found by
+    iterative deepening within the time limit (by default
+    search.TIME_LIMIT), judging unfinished games heuristically. Given a
+    number of processes, that search is split over that many workers.
+
+    Given a bitboard.SearchStats, adds the search's counts and time to it.
     """
-    if terminal(board):
+    position = to_bitboard(board, k)
+    if position.terminal():
         return None
 
-    if player(board) == X:
-        v = -math.inf
-        optimal_action = None
-
-        for action in actions(board):
-            newv = min_value(board=result(board, action), alpha=-math.inf, beta=math.inf)
-            if newv > v:
-                v = newv
-                optimal_action = action
-        return optimal_action
-    
-    elif player(board) == O:
-        v = math.inf
-        optimal_action = None
-
-        for action in actions(board):
-            newv = max_value(board=result(board, action), alpha=-math.inf, beta=math.inf)
-            if newv < v:
-                v = newv
-                optimal_action = action
-        return optimal_action
-
-
-def max_value(board, alpha, beta):
-    if terminal(board):
-        return utility(board)
-
-    maxv = -math.inf
-
-    for action in actions(board):
-        maxv = max(maxv, min_value(result(board, action), alpha, beta))
-        alpha = max(alpha, maxv)
-        if alpha >= beta:
-            break
-    return maxv
-
-
-def min_value(board, alpha, beta):
-    if terminal(board):
-        return utility(board)
-    
-    minv = math.inf
-
-    for action in actions(board):
-        minv = min(minv, max_value(result(board, action), alpha, beta))
-        beta = min(beta, minv)
-        if alpha >= beta:
-            break
-    return minv
\ No newline at end of file
+    with bitboard.counting(stats):
+        if position.geometry is not bitboard.STANDARD or time_limit is not None:
+            time_limit = time_limit or search.TIME_LIMIT
+            if processes is None:
+                move = search.best_move(position, time_limit)
+            else:
+                move = search.parallel_best_move(position, time_limit, processes)
+            return divmod(move.bit_length() - 1, position.geometry.cols)
+
+        # Answer from the opening book if there is one
+        entry = book_entry(position)
+        if entry is not None:
+            if stats is not None:
+                stats.book_hits += 1
+            return divmod(entry[1], 3)
+
+        _, bit = bitboard.best_move(position)
+        return divmod(bit.bit_length() - 1, 3)
+
+
+def principal_variation(board):
+    """
+    Returns (value, actions) for a standard board: its utility under
+    optimal play, and the actions (i, j) of an optimal game from it,
+    which are empty if the game is over.
+    """
+    position = to_bitboard(board)
+    if position.terminal():
+        return position.winner(), []
+    value, moves = bitboard.principal_variation(position)
+    return value, [divmod(bit.bit_length() - 1, 3) for bit in moves]
+
+
+def book_entry(position):
+    """
+    Returns the (value, cell) the opening book has for a position,
+    or None if it has none or there is no book.
+    """
+    global opening_book
+    if opening_book is None:
+        try:
+            with open(book.PATH, "rb") as f:
+                opening_book = f.read()
+        except OSError:
+            opening_book = b""
+        if len(opening_book) != book.SIZE:
+            opening_book = b""
+
+    if not opening_book:
+        return None
+    return book.entry(opening_book, position.code())
+
+
+def max_value(board, alpha, beta, stats=None):
+    position = to_bitboard(board)
+    if position.terminal():
+        return position.winner()
+    with bitboard.counting(stats):
+        return bitboard.max_value(position, alpha, beta)
+
+
+def min_value(board, alpha, beta, stats=None):
+    position = to_bitboard(board)
+    if position.terminal():
+        return position.winner()
+    with bitboard.counting(stats):
+        return bitboard.min_value(position, alpha, beta)
@@ -1,19 +1,96 @@
 import itertools
+import weakref
+
+import sat
+
+# Fixed sentences that exist, by class and operands, so that building an
+# equal one again returns the same object. Sentences with an And inside
+# are built anew each time, since they can still change.
+interned = weakref.WeakValueDictionary()
+
+# Number of conjuncts added to an And so far. A sentence with an And
+# inside keeps its hash and symbols only while this stays as it was when
+# they were found.
+changes = 0
 
 
 class Sentence():
+    # A sentence's hash and the names of its symbols without repeats, or
+    # None until first needed, and the value of changes they were found at
+    __slots__ = ("hash_value", "symbol_names", "version")
+
+    # Whether the sentence has no And inside, which could still be added
+    # to, so that what it is built from can never change
+    fixed = True
+
+    # Hashed along with the operands, so that different kinds of sentence
+    # built from the same operands hash differently
+    kind = None
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def truth_table(self, columns, full):
+        """
+        Evaluates the logical sentence in many models at once. Bit m of
+        each symbol's column in columns, and of the result, is its truth
+        in model m; full has a bit set for every model.
+        """
+        raise Exception("nothing to evaluate")
+
+    def tseitin(self, cnf):
+        """
+        Adds clauses to cnf making a new variable equivalent to the
+        logical sentence, and returns its literal. Use cnf.literal,
+        which reuses the literal of sentences already converted.
+        """
+        raise Exception("nothing to convert")
+
+    def simplify(self, assignment):
+        """
+        Returns an equivalent logical sentence, given the truth of the
+        symbols named in assignment, with constants folded: the empty
+        And is true and the empty Or is false.
+        """
+        raise Exception("nothing to simplify")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
 
+    def operands(self):
+        """Returns the sentences the logical sentence is built from."""
+        return ()
+
+    def refresh(self):
+        """
+        Forgets the hash and symbols kept if the sentence has an And
+        inside and a conjunct has been added to an And since.
+        """
+        if not self.fixed and self.version != changes:
+            self.hash_value = self.symbol_names = None
+            self.version = changes
+
+    def __hash__(self):
+        self.refresh()
+        if self.hash_value is None:
+            self.hash_value = hash((self.kind,) + tuple(self.operands()))
+        return self.hash_value
+
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
-        return set()
+        return set(self.symbol_tuple())
+
+    def symbol_tuple(self):
+        """Returns a tuple of the names of the symbols, without repeats."""
+        self.refresh()
+        if self.symbol_names is None:
+            names = itertools.chain.from_iterable(
+                operand.symbol_tuple() for operand in self.operands()
+            )
+            self.symbol_names = tuple(dict.fromkeys(names))
+        return self.symbol_names
 
     @classmethod
     def validate(cls, sentence):
@@ -42,16 +119,64 @@ class Sentence():
             return f"({s})"
 
 
-class Symbol(Sentence):
+def lookup(cls, operands):
+    """
+    Returns (sentence, key): the sentence of class cls built from
+    operands if one exists, otherwise None, and the key to intern a new
+    one under, or None if an operand has an And inside.
+    """
+    if not all(operand.fixed for operand in operands):
+        return None, None
+    key = (cls,) + tuple(operands)
+    return interned.get(key), key
+
+
+def is_true(sentence):
+    """Checks if a sentence is the constant true, the empty And."""
+    return isinstance(sentence, And) and not sentence.conjuncts
+
+
+def is_false(sentence):
+    """Checks if a sentence is the constant false, the empty Or."""
+    return isinstance(sentence, Or) and not sentence.disjuncts
+
+
+def as_literal(sentence):
+    """
+    Returns (name, truth) if a sentence is a symbol or a negated symbol,
+    otherwise None.
+    """
+    if isinstance(sentence, Symbol):
+        return sentence.name, True
+    if isinstance(sentence, Not) and isinstance(sentence.operand, Symbol):
+        return sentence.operand.name, False
+    return None
 
-    def __init__(self, name):
-        self.name = name
+
+class Symbol(Sentence):
+    __slots__ = ("name", "__weakref__")
+
+    def __new__(cls, name):
+        key = (cls, name)
+        sentence = interned.get(key)
+        if sentence is None:
+            sentence = super().__new__(cls)
+            sentence.name = name
+            sentence.symbol_names = (name,)
+            sentence.hash_value = hash(("symbol", name))
+            interned[key] = sentence
+        return sentence
+
+    def __getnewargs__(self):
+        return (self.name,)
 
     def __eq__(self, other):
-        return isinstance(other, Symbol) and self.name == other.name
+        return self is other or (
+            isinstance(other, Symbol) and self.name == other.name
+        )
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        return self.hash_value
 
     def __repr__(self):
         return self.name
@@ -62,23 +187,56 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def truth_table(self, columns, full):
+        try:
+            return columns[self.name]
+        except KeyError:
+            raise Exception(f"variable {self.name} not in model")
+
+    def tseitin(self, cnf):
+        return cnf.variable(self.name)
+
+    def simplify(self, assignment):
+        if self.name in assignment:
+            return And() if assignment[self.name] else Or()
+        return self
+
     def formula(self):
         return self.name
 
     def symbols(self):
         return {self.name}
 
+    def symbol_tuple(self):
+        return self.symbol_names
+
 
 class Not(Sentence):
-    def __init__(self, operand):
+    __slots__ = ("operand", "fixed", "__weakref__")
+    kind = "not"
+
+    def __new__(cls, operand):
         Sentence.validate(operand)
-        self.operand = operand
+        sentence, key = lookup(cls, (operand,))
+        if sentence is None:
+            sentence = super().__new__(cls)
+            sentence.operand = operand
+            sentence.fixed = key is not None
+            sentence.hash_value = sentence.symbol_names = None
+            sentence.version = changes
+            if key is not None:
+                interned[key] = sentence
+        return sentence
+
+    def __getnewargs__(self):
+        return (self.operand,)
 
     def __eq__(self, other):
-        return isinstance(other, Not) and self.operand == other.operand
+        return self is other or (
+            isinstance(other, Not) and self.operand == other.operand
+        )
 
-    def __hash__(self):
-        return hash(("not", hash(self.operand)))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return f"Not({self.operand})"
@@ -86,27 +244,49 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def truth_table(self, columns, full):
+        return full ^ self.operand.truth_table(columns, full)
+
+    def tseitin(self, cnf):
+        return -cnf.literal(self.operand)
+
+    def simplify(self, assignment):
+        operand = self.operand.simplify(assignment)
+        if is_true(operand):
+            return Or()
+        if is_false(operand):
+            return And()
+        if isinstance(operand, Not):
+            return operand.operand
+        return Not(operand)
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
-        return self.operand.symbols()
+    def operands(self):
+        return (self.operand,)
 
 
 class And(Sentence):
+    # Conjuncts can be added, so an And is never fixed or interned
+    __slots__ = ("conjuncts",)
+    fixed = False
+    kind = "and"
+
     def __init__(self, *conjuncts):
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
+        self.hash_value = self.symbol_names = None
+        self.version = changes
 
     def __eq__(self, other):
-        return isinstance(other, And) and self.conjuncts == other.conjuncts
-
-    def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+        return self is other or (
+            isinstance(other, And) and self.conjuncts == other.conjuncts
         )
 
+    __hash__ = Sentence.__hash__
+
     def __repr__(self):
         conjunctions = ", ".join(
             [str(conjunct) for conjunct in self.conjuncts]
@@ -114,36 +294,132 @@ class And(Sentence):
         return f"And({conjunctions})"
 
     def add(self, conjunct):
+        global changes
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
+        changes += 1
 
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def truth_table(self, columns, full):
+        table = full
+        for conjunct in self.conjuncts:
+            table &= conjunct.truth_table(columns, full)
+            if not table:
+                break
+        return table
+
+    def tseitin(self, cnf):
+        literals = [cnf.literal(conjunct) for conjunct in self.conjuncts]
+        if len(literals) == 1:
+            return literals[0]
+        literal = cnf.new_variable()
+        for conjunct in literals:
+            cnf.clauses.append([-literal, conjunct])
+        cnf.clauses.append([literal] + [-conjunct for conjunct in literals])
+        return literal
+
+    def simplify(self, assignment):
+        conjuncts = []
+        for conjunct in self.conjuncts:
+            conjunct = conjunct.simplify(assignment)
+            if is_false(conjunct):
+                return Or()
+            if isinstance(conjunct, And):
+                conjuncts.extend(conjunct.conjuncts)
+            else:
+                conjuncts.append(conjunct)
+        conjuncts = list(dict.fromkeys(conjuncts))
+        if len(conjuncts) == 1:
+            return conjuncts[0]
+        return And(*conjuncts)
+
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def operands(self):
+        return self.conjuncts
+
+
+class KnowledgeBase(And):
+    """
+    A conjunction that keeps the truth table of its models, so any
+    number of queries can be checked against it without evaluating it
+    again. Each conjunct added only narrows the models already found.
+    The table has a bit for every model of the symbols seen, so it is
+    meant for at most about CHUNK_SYMBOLS symbols.
+    """
+    __slots__ = ("names", "columns", "full", "models")
+
+    def __init__(self, *conjuncts):
+        self.models = None
+        super().__init__(*conjuncts)
+        self.names = []
+        self.columns = {}
+        self.full = 1
+
+    def add(self, conjunct):
+        super().add(conjunct)
+        if self.models is not None:
+            self.extend(conjunct.symbols())
+            self.models &= conjunct.truth_table(self.columns, self.full)
+
+    def entails(self, query):
+        """Checks if knowledge base entails query."""
+        if self.models is None:
+            self.extend(self.symbols())
+            self.models = self.truth_table(self.columns, self.full)
+        self.extend(query.symbols())
+        return not self.models & ~query.truth_table(self.columns, self.full)
+
+    def extend(self, symbols):
+        """
+        Adds the symbols not in the truth table yet. Each doubles the
+        models, which are the same with the new symbol false or true.
+        """
+        new = sorted(symbols.difference(self.names))
+        if not new:
+            return
+        for symbol in new:
+            if self.models is not None:
+                self.models |= self.models << (1 << len(self.names))
+            self.names.append(symbol)
+        self.columns = truth_columns(self.names)
+        self.full = (1 << (1 << len(self.names))) - 1
 
 
 class Or(Sentence):
-    def __init__(self, *disjuncts):
+    __slots__ = ("disjuncts", "fixed", "__weakref__")
+    kind = "or"
+
+    def __new__(cls, *disjuncts):
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
-        self.disjuncts = list(disjuncts)
+        sentence, key = lookup(cls, disjuncts)
+        if sentence is None:
+            sentence = super().__new__(cls)
+            sentence.disjuncts = list(disjuncts)
+            sentence.fixed = key is not None
+            sentence.hash_value = sentence.symbol_names = None
+            sentence.version = changes
+            if key is not None:
+                interned[key] = sentence
+        return sentence
+
+    def __getnewargs__(self):
+        return tuple(self.disjuncts)
 
     def __eq__(self, other):
-        return isinstance(other, Or) and self.disjuncts == other.disjuncts
-
-    def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+        return self is other or (
+            isinstance(other, Or) and self.disjuncts == other.disjuncts
         )
 
+    __hash__ = Sentence.__hash__
+
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
@@ -151,30 +427,79 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def truth_table(self, columns, full):
+        table = 0
+        for disjunct in self.disjuncts:
+            table |= disjunct.truth_table(columns, full)
+            if table == full:
+                break
+        return table
+
+    def tseitin(self, cnf):
+        literals = [cnf.literal(disjunct) for disjunct in self.disjuncts]
+        if len(literals) == 1:
+            return literals[0]
+        literal = cnf.new_variable()
+        for disjunct in literals:
+            cnf.clauses.append([literal, -disjunct])
+        cnf.clauses.append([-literal] + literals)
+        return literal
+
+    def simplify(self, assignment):
+        disjuncts = []
+        for disjunct in self.disjuncts:
+            disjunct = disjunct.simplify(assignment)
+            if is_true(disjunct):
+                return And()
+            if isinstance(disjunct, Or):
+                disjuncts.extend(disjunct.disjuncts)
+            else:
+                disjuncts.append(disjunct)
+        disjuncts = list(dict.fromkeys(disjuncts))
+        if len(disjuncts) == 1:
+            return disjuncts[0]
+        return Or(*disjuncts)
+
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def operands(self):
+        return self.disjuncts
 
 
 class Implication(Sentence):
-    def __init__(self, antecedent, consequent):
+    __slots__ = ("antecedent", "consequent", "fixed", "__weakref__")
+    kind = "implies"
+
+    def __new__(cls, antecedent, consequent):
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
-        self.antecedent = antecedent
-        self.consequent = consequent
+        sentence, key = lookup(cls, (antecedent, consequent))
+        if sentence is None:
+            sentence = super().__new__(cls)
+            sentence.antecedent = antecedent
+            sentence.consequent = consequent
+            sentence.fixed = key is not None
+            sentence.hash_value = sentence.symbol_names = None
+            sentence.version = changes
+            if key is not None:
+                interned[key] = sentence
+        return sentence
+
+    def __getnewargs__(self):
+        return (self.antecedent, self.consequent)
 
     def __eq__(self, other):
-        return (isinstance(other, Implication)
-                and self.antecedent == other.antecedent
-                and self.consequent == other.consequent)
+        return self is other or (
+            isinstance(other, Implication)
+            and self.antecedent == other.antecedent
+            and self.consequent == other.consequent
+        )
 
-    def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
@@ -183,29 +508,77 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def truth_table(self, columns, full):
+        return ((full ^ self.antecedent.truth_table(columns, full))
+                | self.consequent.truth_table(columns, full))
+
+    def tseitin(self, cnf):
+        antecedent = cnf.literal(self.antecedent)
+        consequent = cnf.literal(self.consequent)
+        literal = cnf.new_variable()
+        cnf.clauses.append([-literal, -antecedent, consequent])
+        cnf.clauses.append([literal, antecedent])
+        cnf.clauses.append([literal, -consequent])
+        return literal
+
+    def simplify(self, assignment):
+        antecedent = self.antecedent.simplify(assignment)
+        if is_false(antecedent):
+            return And()
+        if is_true(antecedent):
+            return self.consequent.simplify(assignment)
+
+        # The consequent only matters where the antecedent is true
+        literal = as_literal(antecedent)
+        if literal is not None:
+            assignment = {**assignment, literal[0]: literal[1]}
+        consequent = self.consequent.simplify(assignment)
+
+        if is_true(consequent) or antecedent == consequent:
+            return And()
+        if is_false(consequent):
+            return Not(antecedent).simplify({})
+        return Implication(antecedent, consequent)
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
-        return set.union(self.antecedent.symbols(), self.consequent.symbols())
+    def operands(self):
+        return (self.antecedent, self.consequent)
 
 
 class Biconditional(Sentence):
-    def __init__(self, left, right):
+    __slots__ = ("left", "right", "fixed", "__weakref__")
+    kind = "biconditional"
+
+    def __new__(cls, left, right):
         Sentence.validate(left)
         Sentence.validate(right)
-        self.left = left
-        self.right = right
+        sentence, key = lookup(cls, (left, right))
+        if sentence is None:
+            sentence = super().__new__(cls)
+            sentence.left = left
+            sentence.right = right
+            sentence.fixed = key is not None
+            sentence.hash_value = sentence.symbol_names = None
+            sentence.version = changes
+            if key is not None:
+                interned[key] = sentence
+        return sentence
+
+    def __getnewargs__(self):
+        return (self.left, self.right)
 
     def __eq__(self, other):
-        return (isinstance(other, Biconditional)
-                and self.left == other.left
-                and self.right == other.right)
+        return self is other or (
+            isinstance(other, Biconditional)
+            and self.left == other.left
+            and self.right == other.right
+        )
 
-    def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+    __hash__ = Sentence.__hash__
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
@@ -216,17 +589,207 @@ class Biconditional(Sentence):
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
+    def truth_table(self, columns, full):
+        return full ^ (self.left.truth_table(columns, full)
+                       ^ self.right.truth_table(columns, full))
+
+    def tseitin(self, cnf):
+        left = cnf.literal(self.left)
+        right = cnf.literal(self.right)
+        literal = cnf.new_variable()
+        cnf.clauses.append([-literal, -left, right])
+        cnf.clauses.append([-literal, left, -right])
+        cnf.clauses.append([literal, left, right])
+        cnf.clauses.append([literal, -left, -right])
+        return literal
+
+    def simplify(self, assignment):
+        left = self.left.simplify(assignment)
+        right = self.right.simplify(assignment)
+        if left == right:
+            return And()
+        if is_true(left):
+            return right
+        if is_true(right):
+            return left
+        if is_false(left):
+            return Not(right).simplify({})
+        if is_false(right):
+            return Not(left).simplify({})
+        return Biconditional(left, right)
+
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
-        return set.union(self.left.symbols(), self.right.symbols())
+    def operands(self):
+        return (self.left, self.right)
+
+
+# Most symbols whose models the bitwise engine evaluates at once; the
+# models of the others are taken a chunk at a time
+CHUNK_SYMBOLS = 20
 
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
+class CNF():
+    """
+    Clauses over integer literals, as for a SAT solver, equisatisfiable
+    with the logical sentences added. Each subformula gets one variable,
+    with clauses making it equivalent to the subformula (the Tseitin
+    transformation), so the clauses grow linearly with the sentences.
+    Equal subformulas share their variable.
+    """
+
+    def __init__(self):
+        self.clauses = []
+
+        # Maps symbol names, and subformulas converted, to their variables
+        self.variables = {}
+        self.literals = {}
+        self.count = 0
+
+    def add(self, sentence):
+        """Adds clauses that hold exactly when sentence is true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """Returns the literal equivalent to sentence, converting it once."""
+        literal = self.literals.get(sentence)
+        if literal is None:
+            literal = sentence.tseitin(self)
+            self.literals[sentence] = literal
+        return literal
+
+    def variable(self, name):
+        """Returns the variable of the symbol called name."""
+        variable = self.variables.get(name)
+        if variable is None:
+            variable = self.variables[name] = self.new_variable()
+        return variable
+
+    def new_variable(self):
+        self.count += 1
+        return self.count
+
+    def dimacs(self):
+        """
+        Returns the clauses in DIMACS CNF format, with a comment naming
+        the variable of each symbol.
+        """
+        lines = [f"c {variable} {name}" for name, variable in self.variables.items()]
+        lines.append(f"p cnf {self.count} {len(self.clauses)}")
+        lines.extend(
+            " ".join(str(literal) for literal in clause) + " 0"
+            for clause in self.clauses
+        )
+        return "\n".join(lines) + "\n"
+
+
+def preprocess(knowledge, query):
+    """
+    Returns (knowledge, query, eliminated): the knowledge base and query
+    simplified, and the names of the symbols no longer in either.
+
+    Symbols that conjuncts of the knowledge base state as facts are
+    substituted everywhere, which can make more of them facts in turn,
+    so a query is entailed by the result exactly when by the original.
+    """
+    symbols = set.union(knowledge.symbols(), query.symbols())
+    assignment = {}
+    while True:
+        knowledge = knowledge.simplify(assignment)
+        facts = knowledge.conjuncts if isinstance(knowledge, And) else [knowledge]
+        units = [as_literal(fact) for fact in facts]
+        units = [unit for unit in units if unit is not None]
+        if not units:
+            break
+        assignment.update(units)
+
+    query = query.simplify(assignment)
+    eliminated = symbols - set.union(knowledge.symbols(), query.symbols())
+    return knowledge, query, eliminated
+
+
+def model_check(knowledge, query, engine="bitwise"):
+    """
+    Checks if knowledge base entails query.
+
+    The "bitwise" engine evaluates both in every model at once, one bit
+    per model; "enumerate" evaluates them one model at a time; "sat"
+    looks for a model of knowledge and not query with a SAT solver.
+    Except for a KnowledgeBase, which keeps its own models, both are
+    preprocessed first so only the symbols left are searched.
+    """
+    if isinstance(knowledge, KnowledgeBase) and engine == "bitwise":
+        return knowledge.entails(query)
+    knowledge, query, _ = preprocess(knowledge, query)
+
+    if engine == "bitwise":
+        return bitwise_check(knowledge, query)
+    if engine == "enumerate":
+        return enumerate_check(knowledge, query)
+    if engine == "sat":
+        return sat_check(knowledge, query)
+    raise ValueError(f"unknown model checking engine {engine}")
+
+
+def bitwise_check(knowledge, query):
+    """Checks if knowledge base entails query, using truth tables."""
+
+    # Pack the models of up to CHUNK_SYMBOLS symbols into each integer,
+    # and go through the assignments to any others one by one
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    packed, fixed = symbols[:CHUNK_SYMBOLS], symbols[CHUNK_SYMBOLS:]
+    full = (1 << (1 << len(packed))) - 1
+    columns = truth_columns(packed)
+
+    for values in itertools.product((0, full), repeat=len(fixed)):
+        columns.update(zip(fixed, values))
+
+        # Entailment fails in any model where knowledge holds but query does not
+        if knowledge.truth_table(columns, full) & ~query.truth_table(columns, full):
+            return False
+    return True
+
+
+def sat_check(knowledge, query):
+    """
+    Checks if knowledge base entails query: if knowledge and the
+    negation of query cannot both be true.
+    """
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return sat.solve(cnf.clauses) is None
+
+
+def truth_columns(symbols):
+    """
+    Returns the truth column of each of a list of symbols over all their
+    models: bit m of symbol i's column is set if bit i of m is.
+    """
+    models = 1 << len(symbols)
+    columns = {}
+    for i, symbol in enumerate(symbols):
+        # Runs of 2 ** i false models and 2 ** i true ones, doubled
+        # until they cover every model
+        width = 1 << i
+        column = ((1 << width) - 1) << width
+        span = 2 * width
+        while span < models:
+            column |= column << span
+            span *= 2
+        columns[symbol] = column
+    return columns
+
+
+def enumerate_check(knowledge, query):
+    """Checks if knowledge base entails query, one model at a time."""
 
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
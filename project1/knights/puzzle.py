@@ -102,6 +102,8 @@ def main():
         if len(knowledge.conjuncts) == 0:
             print("    Not yet implemented.")
         else:
+            # Find the models of the puzzle once for all the symbols
+            knowledge = KnowledgeBase(*knowledge.conjuncts)
             for symbol in symbols:
                 if model_check(knowledge, symbol):
                     print(f"    {symbol}")
@@ -0,0 +1,321 @@
+"""
+A conflict-driven clause learning (CDCL) SAT solver.
+
+Clauses are lists of literals in the DIMACS convention: variable v is
+the positive integer v, true as literal v and false as literal -v.
+
+Unit propagation watches two literals of each clause, so only clauses
+watching a literal that just became false are visited. Each conflict is
+analysed back to its first unique implication point, and the clause
+learned from it is added, and the search jumps back to the level where
+that clause becomes unit. Variables are chosen by activity, bumped for
+those in recent conflicts, with their last value, and the search
+restarts after a Luby sequence of conflict counts.
+"""
+
+import heapq
+
+# Conflicts before the first restart; later restarts wait a term of the
+# Luby sequence times this many
+RESTART_BASE = 100
+
+# Factor the activity bump grows by after each conflict, which makes
+# older activity decay relative to new
+ACTIVITY_GROWTH = 1 / 0.95
+
+# Activity above which all activities are scaled down
+ACTIVITY_LIMIT = 1e100
+
+
+def solve(clauses):
+    """
+    Returns a model satisfying every clause, as a dict mapping each
+    variable to True or False, or None if there is none.
+    """
+    solver = Solver()
+    for clause in clauses:
+        solver.add_clause(clause)
+    return solver.solve()
+
+
+class Solver():
+
+    def __init__(self):
+        self.clauses = []
+        self.watches = {}
+
+        # Per variable, indexed from 1: value (1 true, -1 false, 0 unset),
+        # decision level, index of the clause that implied it (or None),
+        # activity, and the value it last had
+        self.values = [0]
+        self.levels = [0]
+        self.reasons = [None]
+        self.activity = [0.0]
+        self.phases = [-1]
+
+        # Assigned literals in order, and where each decision level starts
+        self.trail = []
+        self.level_starts = []
+        self.propagated = 0
+
+        # Unassigned variables by activity, possibly with stale entries
+        self.order = []
+        self.bump = 1.0
+
+        # False once the clauses are known to be unsatisfiable
+        self.consistent = True
+
+    def add_variable(self, variable):
+        while len(self.values) <= variable:
+            self.values.append(0)
+            self.levels.append(0)
+            self.reasons.append(None)
+            self.activity.append(0.0)
+            self.phases.append(-1)
+            heapq.heappush(self.order, (0.0, len(self.values) - 1))
+
+    def add_clause(self, literals):
+        """
+        Adds a clause, before solving.
+        """
+        clause = []
+        for literal in literals:
+            if -literal in clause:
+                return
+            if literal not in clause:
+                clause.append(literal)
+                self.add_variable(abs(literal))
+
+        # Drop literals already false, and the clause if one is true
+        clause = [literal for literal in clause if self.value(literal) != -1]
+        if any(self.value(literal) == 1 for literal in clause):
+            return
+
+        if not clause:
+            self.consistent = False
+        elif len(clause) == 1:
+            self.assign(clause[0], None)
+            if self.propagate() is not None:
+                self.consistent = False
+        else:
+            self.attach(clause)
+
+    def attach(self, clause):
+        """
+        Stores a clause of two or more literals, watching its first two,
+        and returns its index.
+        """
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches.setdefault(clause[0], []).append(index)
+        self.watches.setdefault(clause[1], []).append(index)
+        return index
+
+    def value(self, literal):
+        """
+        Returns 1 if literal is true, -1 if it is false, 0 if unassigned.
+        """
+        value = self.values[abs(literal)]
+        return value if literal > 0 else -value
+
+    def assign(self, literal, reason):
+        variable = abs(literal)
+        self.values[variable] = 1 if literal > 0 else -1
+        self.levels[variable] = len(self.level_starts)
+        self.reasons[variable] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Assigns every literal forced by unit clauses. Returns the index
+        of a clause left with every literal false, or None.
+        """
+        values = self.values
+        while self.propagated < len(self.trail):
+            false = -self.trail[self.propagated]
+            self.propagated += 1
+
+            watching = self.watches.get(false, [])
+            kept = 0
+            for position, index in enumerate(watching):
+                clause = self.clauses[index]
+
+                # Keep the literal that became false second
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], false
+
+                first = clause[0]
+                first_value = values[abs(first)] if first > 0 else -values[abs(first)]
+                if first_value == 1:
+                    watching[kept] = index
+                    kept += 1
+                    continue
+
+                # Watch another literal that is not false, if there is one
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    if (values[abs(literal)] if literal > 0 else -values[abs(literal)]) != -1:
+                        clause[1], clause[k] = literal, false
+                        self.watches.setdefault(literal, []).append(index)
+                        break
+                else:
+                    watching[kept] = index
+                    kept += 1
+                    if first_value == -1:
+                        # Conflict: keep the rest of the watches and stop
+                        watching[kept:] = watching[position + 1:]
+                        return index
+                    self.assign(first, index)
+
+            del watching[kept:]
+        return None
+
+    def analyze(self, conflict):
+        """
+        Returns (clause, level): the clause learned from a conflict, whose
+        first literal is the only one at the current level, and the level
+        to jump back to, where it forces that literal.
+        """
+        level = len(self.level_starts)
+        learned = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        index = len(self.trail) - 1
+        clause = self.clauses[conflict]
+
+        while True:
+            for other in clause:
+                variable = abs(other)
+                if other == literal or variable in seen or self.levels[variable] == 0:
+                    continue
+                seen.add(variable)
+                self.bump_activity(variable)
+                if self.levels[variable] == level:
+                    pending += 1
+                else:
+                    learned.append(other)
+
+            # The latest literal on the trail involved in the conflict
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = self.clauses[self.reasons[abs(literal)]]
+
+        learned[0] = -literal
+        if len(learned) == 1:
+            return learned, 0
+
+        # Watch the literal with the highest level after the asserting one
+        deepest = max(range(1, len(learned)),
+                      key=lambda k: self.levels[abs(learned[k])])
+        learned[1], learned[deepest] = learned[deepest], learned[1]
+        return learned, self.levels[abs(learned[1])]
+
+    def bump_activity(self, variable):
+        self.activity[variable] += self.bump
+        if self.activity[variable] > ACTIVITY_LIMIT:
+            self.activity = [activity / ACTIVITY_LIMIT for activity in self.activity]
+            self.bump /= ACTIVITY_LIMIT
+            self.order = [
+                (-self.activity[variable], variable)
+                for variable in range(1, len(self.values))
+                if self.values[variable] == 0
+            ]
+            heapq.heapify(self.order)
+        if self.values[variable] == 0:
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+
+    def backtrack(self, level):
+        """
+        Undoes every assignment above decision level level.
+        """
+        if len(self.level_starts) <= level:
+            return
+        start = self.level_starts[level]
+        for literal in self.trail[start:]:
+            variable = abs(literal)
+            self.phases[variable] = self.values[variable]
+            self.values[variable] = 0
+            self.reasons[variable] = None
+            heapq.heappush(self.order, (-self.activity[variable], variable))
+        del self.trail[start:]
+        del self.level_starts[level:]
+        self.propagated = start
+
+    def decide(self):
+        """
+        Returns the most active unassigned variable, or None if every
+        variable is assigned.
+        """
+        while self.order:
+            activity, variable = heapq.heappop(self.order)
+            if self.values[variable] == 0 and -activity == self.activity[variable]:
+                return variable
+        for variable in range(1, len(self.values)):
+            if self.values[variable] == 0:
+                return variable
+        return None
+
+    def solve(self):
+        """
+        Returns a model satisfying every clause added, as a dict mapping
+        each variable to True or False, or None if there is none.
+        """
+        if not self.consistent:
+            return None
+
+        conflicts = 0
+        restarts = 0
+        limit = RESTART_BASE * luby(restarts)
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                if not self.level_starts:
+                    self.consistent = False
+                    return None
+                conflicts += 1
+                learned, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learned) == 1:
+                    self.assign(learned[0], None)
+                else:
+                    self.assign(learned[0], self.attach(learned))
+                self.bump *= ACTIVITY_GROWTH
+                continue
+
+            if conflicts >= limit:
+                conflicts = 0
+                restarts += 1
+                limit = RESTART_BASE * luby(restarts)
+                self.backtrack(0)
+                continue
+
+            variable = self.decide()
+            if variable is None:
+                return {
+                    variable: self.values[variable] == 1
+                    for variable in range(1, len(self.values))
+                }
+            self.level_starts.append(len(self.trail))
+            self.assign(variable * self.phases[variable], None)
+
+
+def luby(n):
+    """
+    Returns term n, counting from 0, of the Luby sequence
+    1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ...
+    """
+    size, power = 1, 0
+    while size < n + 1:
+        power += 1
+        size = 2 * size + 1
+    while size - 1 != n:
+        size = (size - 1) // 2
+        power -= 1
+        n = n % size
+    return 2 ** power